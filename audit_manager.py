@@ -8,19 +8,300 @@
 """
 
 import json
+import os
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Tuple
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import price_store
+
+# orjson (опционально) - быстрая сериализация архива
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson (опционально) - потоковый разбор архива без загрузки всего JSON
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Колонки котировок, которые нужны для аудита
+PRICE_COLUMNS = ['DATE', 'HIGH', 'LOW', 'CLOSE']
+
+# При аудите цены приводятся к float32: точности (~7 знаков) хватает для
+# биржевого шага цены, а объём данных при сканировании периода вдвое меньше
+PRICE_DTYPES = {'HIGH': 'float32', 'LOW': 'float32', 'CLOSE': 'float32'}
+
+
+def _json_loads(data: bytes):
+    """Разбирает JSON из байтов (orjson, если установлен)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """
+    Сериализует объект в UTF-8 JSON (orjson, если установлен).
+    
+    Args:
+        obj: объект для сериализации
+        indent: форматировать с отступом 2 (для снимка архива)
+        
+    Returns:
+        JSON в виде байтов
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+# Поля, в которых старые версии хранили результат прошлого аудита прямо
+# в рекомендации (теперь он в отдельном файле, см. AuditManager._load_memo)
+_LEGACY_MEMO_KEYS = ("last_audited_date", "last_audited_mtime_ns", "last_audit_result")
+
+
+def _to_day(value) -> int:
+    """Переводит дату (date или строку YYYY-MM-DD) в число дней с 1970-01-01."""
+    return int(np.datetime64(value, 'D').astype('int64'))
+
+
+def _range_extremes_py(highs: np.ndarray, lows: np.ndarray,
+                       start: int, end: int) -> Tuple[float, float]:
+    """
+    Максимум HIGH и минимум LOW на срезе [start, end) за один проход.
+    
+    Args:
+        highs: массив HIGH
+        lows: массив LOW
+        start: начало среза (включительно)
+        end: конец среза (не включительно), end > start
+        
+    Returns:
+        (max HIGH, min LOW)
+    """
+    max_high = highs[start]
+    min_low = lows[start]
+    for i in range(start + 1, end):
+        if highs[i] > max_high:
+            max_high = highs[i]
+        if lows[i] < min_low:
+            min_low = lows[i]
+    return max_high, min_low
+
+
+def _range_extremes_np(highs: np.ndarray, lows: np.ndarray,
+                       start: int, end: int) -> Tuple[float, float]:
+    """Векторный вариант _range_extremes_py (без numba)."""
+    return highs[start:end].max(), lows[start:end].min()
+
+
+# Реализация _range_extremes выбирается при первом вызове
+_range_extremes_impl = None
+
+
+def _range_extremes(highs: np.ndarray, lows: np.ndarray,
+                    start: int, end: int) -> Tuple[float, float]:
+    """
+    Максимум HIGH и минимум LOW на срезе [start, end).
+    
+    numba (опционально) импортируется при первом вызове, а не при импорте
+    модуля: кто только читает архив, не платит за импорт и компиляцию.
+    """
+    global _range_extremes_impl
+    if _range_extremes_impl is None:
+        try:
+            from numba import njit
+            _range_extremes_impl = njit(cache=True)(_range_extremes_py)
+        except ImportError:
+            _range_extremes_impl = _range_extremes_np
+    return _range_extremes_impl(highs, lows, start, end)
+
+
+def _prepare_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Добавляет к котировкам служебные колонки для аудита.
+    
+    Args:
+        df: DataFrame с колонками PRICE_COLUMNS, отсортированный по DATE
+        
+    Returns:
+        DataFrame с ценами в float32 и колонками _day, _high_after, _low_after
+    """
+    # Котировки хранятся в float64 (общая Parquet-копия), для аудита - float32
+    df = df.astype(PRICE_DTYPES, copy=False)
+    
+    # Дни с 1970-01-01 (int64): фильтры по дате - целочисленные сравнения
+    df['_day'] = df['DATE'].to_numpy().astype('datetime64[D]').view('int64')
+    
+    # Максимум HIGH / минимум LOW от каждой строки до конца данных:
+    # один проход на тикер, дальше проверка любой рекомендации - O(1)
+    highs = df['HIGH'].to_numpy()
+    lows = df['LOW'].to_numpy()
+    df['_high_after'] = np.maximum.accumulate(highs[::-1])[::-1]
+    df['_low_after'] = np.minimum.accumulate(lows[::-1])[::-1]
+    return df
+
+
+def _set_date_keys(rec: Dict, moment: datetime):
+    """
+    Записывает в рекомендацию производные поля даты.
+    
+    date_ymd ("YYYY-MM-DD") сравнивается как строка, date_epoch_ms - для
+    арифметики с датами; оба избавляют от разбора rec["date"] при аудите.
+    """
+    rec["date_ymd"] = moment.date().isoformat()
+    rec["date_epoch_ms"] = int(moment.timestamp() * 1000)
+
+
+def _read_journal(journal_file: Path) -> Tuple[List[Dict], Dict[Tuple[str, str], Dict]]:
+    """
+    Читает журнал изменений архива.
+    
+    Args:
+        journal_file: путь к журналу (JSONL)
+        
+    Returns:
+        (добавленные рекомендации в порядке журнала,
+         {(ticker, date): итоговые изменённые поля})
+    """
+    adds: List[Dict] = []
+    updates: Dict[Tuple[str, str], Dict] = {}
+    if not journal_file.exists():
+        return adds, updates
+    
+    with open(journal_file, 'rb') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = _json_loads(line)
+            except json.JSONDecodeError:
+                # Недописанная строка (например, после сбоя) - пропускаем
+                logger.warning("⚠️  Повреждённая строка %d в %s", line_no, journal_file)
+                continue
+            
+            if entry.get("op") == "add":
+                adds.append(entry["rec"])
+            elif entry.get("op") == "update":
+                updates.setdefault((entry["ticker"], entry["date"]), {}).update(entry["fields"])
+    return adds, updates
+
+
+def _finish_rec(rec: Dict, fields: Optional[Dict] = None):
+    """
+    Применяет к рекомендации изменения из журнала и нормализует её.
+    
+    Рекомендациям из старых архивов без date_ymd / date_epoch_ms эти поля
+    дописываются, устаревшие поля результата аудита удаляются.
+    """
+    if fields:
+        rec.update(fields)
+    if "date_ymd" not in rec or "date_epoch_ms" not in rec:
+        _set_date_keys(rec, datetime.fromisoformat(rec["date"]))
+    for key in _LEGACY_MEMO_KEYS:
+        rec.pop(key, None)
+
+
+def load_archive(archive_file: Path) -> Dict:
+    """
+    Загружает архив рекомендаций: снимок JSON + журнал изменений JSONL.
+    
+    Журнал (archive_file с расширением .jsonl) содержит по одной операции
+    на строку:
+    - {"op": "add", "rec": {...}} - новая рекомендация
+    - {"op": "update", "ticker": ..., "date": ..., "fields": {...}} - изменение полей
+    
+    Args:
+        archive_file: путь к снимку архива (JSON)
+        
+    Returns:
+        Архив вида {"recommendations": [...]}
+    """
+    archive_file = Path(archive_file)
+    if archive_file.exists():
+        archive = _json_loads(archive_file.read_bytes())
+    else:
+        archive = {"recommendations": []}
+    
+    recs = archive["recommendations"]
+    adds, updates = _read_journal(archive_file.with_suffix('.jsonl'))
+    if adds:
+        keys = {(r["ticker"], r["date"]) for r in recs}
+        for rec in adds:
+            key = (rec["ticker"], rec["date"])
+            if key in keys:
+                # Уже в снимке: сбой между записью снимка и удалением журнала
+                continue
+            keys.add(key)
+            recs.append(rec)
+    
+    for rec in recs:
+        _finish_rec(rec, updates.get((rec["ticker"], rec["date"])))
+    
+    return archive
+
+
+def iter_archive(archive_file: Path) -> Iterator[Dict]:
+    """
+    Перебирает рекомендации архива по одной (в том же порядке, что load_archive).
+    
+    Если установлен ijson, снимок разбирается потоково - весь архив в памяти
+    не строится: журнал (его размер ограничен компактизацией) читается
+    заранее, и его изменения применяются к рекомендациям по ходу разбора.
+    
+    Args:
+        archive_file: путь к снимку архива (JSON)
+        
+    Yields:
+        Рекомендации (с полями date_ymd / date_epoch_ms)
+    """
+    archive_file = Path(archive_file)
+    if not IJSON_AVAILABLE:
+        yield from load_archive(archive_file)["recommendations"]
+        return
+    
+    adds, updates = _read_journal(archive_file.with_suffix('.jsonl'))
+    seen: Set[Tuple[str, str]] = set()
+    
+    if archive_file.exists():
+        with open(archive_file, 'rb') as f:
+            for rec in ijson.items(f, 'recommendations.item', use_float=True):
+                key = (rec["ticker"], rec["date"])
+                seen.add(key)
+                _finish_rec(rec, updates.get(key))
+                yield rec
+    
+    for rec in adds:
+        key = (rec["ticker"], rec["date"])
+        if key in seen:
+            continue
+        seen.add(key)
+        _finish_rec(rec, updates.get(key))
+        yield rec
+
 
 class AuditManager:
     """Менеджер для аудита рекомендаций."""
     
+    # Журнал сворачивается в снимок, когда становится больше половины
+    # снимка (но не раньше 64 КБ): перезапись снимка амортизируется
+    JOURNAL_COMPACT_RATIO = 0.5
+    JOURNAL_MIN_COMPACT_BYTES = 64 * 1024
+    
     def __init__(self, data_folder: str = "stock_data", 
                  archive_file: str = "recommendations_archive.json"):
         """
@@ -32,20 +313,113 @@ class AuditManager:
         """
         self.data_folder = Path(data_folder)
         self.archive_file = Path(archive_file)
+        self.journal_file = self.archive_file.with_suffix('.jsonl')
+        # Результаты прошлого аудита незавершённых рекомендаций
+        self.memo_file = self.archive_file.with_suffix('.memo.json')
+        self._memo: Optional[Dict[str, Dict]] = None
         self.archive = self._load_archive()
+        self._build_index()
     
     def _load_archive(self) -> Dict:
-        """Загружает архив рекомендаций."""
-        if self.archive_file.exists():
-            with open(self.archive_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"recommendations": []}
+        """Загружает архив рекомендаций (снимок + журнал)."""
+        return load_archive(self.archive_file)
+    
+    def _append_journal(self, entries: List[Dict]):
+        """
+        Дописывает операции в журнал архива (без перезаписи снимка).
+        
+        Если журнал вырос больше порога, архив сворачивается в снимок
+        (save_archive), чтобы журнал не рос бесконечно.
+        """
+        if not entries:
+            return
+        with open(self.journal_file, 'ab') as f:
+            f.write(b''.join(_json_dumps(entry) + b'\n' for entry in entries))
+            journal_size = f.tell()
+        
+        try:
+            snapshot_size = self.archive_file.stat().st_size
+        except FileNotFoundError:
+            snapshot_size = 0
+        if journal_size > max(self.JOURNAL_MIN_COMPACT_BYTES,
+                              snapshot_size * self.JOURNAL_COMPACT_RATIO):
+            self.save_archive()
+    
+    def _load_memo(self) -> Dict[str, Dict]:
+        """
+        Возвращает результаты прошлого аудита (загружаются один раз).
+        
+        Returns:
+            {тикер: {"mtime_ns": время изменения CSV,
+                     "results": {дата рекомендации: результат аудита}}}
+        """
+        if self._memo is None:
+            try:
+                self._memo = _json_loads(self.memo_file.read_bytes())
+            except (OSError, ValueError):
+                self._memo = {}
+        return self._memo
+    
+    def _save_memo(self, memo: Dict[str, Dict]):
+        """Перезаписывает файл результатов прошлого аудита (атомарно)."""
+        self._memo = memo
+        tmp_path = self.memo_file.with_suffix(self.memo_file.suffix + '.tmp')
+        tmp_path.write_bytes(_json_dumps(memo))
+        os.replace(tmp_path, self.memo_file)
+    
+    def _build_index(self):
+        """
+        Строит индексы архива для поиска за O(1).
+        
+        _index: (ticker, YYYY-MM-DD) -> рекомендация (первая с такой датой)
+        _added_keys: (ticker, YYYY-MM-DD, signal) - для проверки дублей
+        """
+        self._index: Dict[Tuple[str, str], Dict] = {}
+        self._added_keys: Set[Tuple[str, str, str]] = set()
+        self._frame: Optional[pd.DataFrame] = None
+        for rec in self.archive["recommendations"]:
+            self._index_rec(rec)
+    
+    def _index_rec(self, rec: Dict):
+        """Добавляет рекомендацию в индексы."""
+        day = rec["date_ymd"]
+        self._index.setdefault((rec["ticker"], day), rec)
+        self._added_keys.add((rec["ticker"], day, rec["signal"]))
+    
+    def _recs_frame(self) -> pd.DataFrame:
+        """
+        Возвращает колоночное представление архива (строится лениво и кэшируется).
+        
+        Строки идут в том же порядке, что и archive["recommendations"];
+        кэш сбрасывается при любом изменении рекомендаций.
+        
+        Returns:
+            DataFrame с колонками ticker, signal, status (category) и result (float)
+        """
+        if self._frame is None:
+            recs = self.archive["recommendations"]
+            self._frame = pd.DataFrame({
+                "ticker": pd.Categorical([r["ticker"] for r in recs]),
+                "signal": pd.Categorical([r["signal"] for r in recs]),
+                "status": pd.Categorical([r["status"] for r in recs]),
+                "result": pd.array([r["result"] for r in recs], dtype="Float64").astype(float),
+            })
+        return self._frame
     
     def save_archive(self):
-        """Сохраняет архив рекомендаций."""
-        with open(self.archive_file, 'w', encoding='utf-8') as f:
-            json.dump(self.archive, f, ensure_ascii=False, indent=2)
-        logger.info(f"✅ Архив сохранён: {self.archive_file}")
+        """
+        Сохраняет полный снимок архива и очищает журнал (компактизация).
+        
+        Обычные изменения дописываются в журнал; полная перезапись нужна
+        только чтобы журнал не рос бесконечно (вызывается из _append_journal).
+        Снимок пишется во временный файл и подменяется атомарно.
+        """
+        tmp_path = self.archive_file.with_suffix(self.archive_file.suffix + '.tmp')
+        tmp_path.write_bytes(_json_dumps(self.archive, indent=True))
+        os.replace(tmp_path, self.archive_file)
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+        logger.info("✅ Архив сохранён: %s", self.archive_file)
     
     def add_recommendation(self, ticker: str, signal: str, 
                          entry_price: float, target1: float, target2: float,
@@ -69,15 +443,13 @@ class AuditManager:
             comment: комментарий
         """
         # Проверяем, нет ли уже рекомендации для этого тикера сегодня
-        today = datetime.now().date()
-        for rec in self.archive["recommendations"]:
-            rec_date = pd.to_datetime(rec["date"]).date()
-            if rec["ticker"] == ticker and rec_date == today and rec["signal"] == signal:
-                logger.info(f"⚠️  Рекомендация {ticker} {signal} уже добавлена сегодня")
-                return
+        now = datetime.now()
+        if (ticker, now.date().isoformat(), signal) in self._added_keys:
+            logger.info("⚠️  Рекомендация %s %s уже добавлена сегодня", ticker, signal)
+            return
         
         rec = {
-            "date": datetime.now().isoformat(),
+            "date": now.isoformat(),
             "ticker": ticker,
             "signal": signal,
             "entry_price": entry_price,
@@ -90,11 +462,43 @@ class AuditManager:
             "status": "ACTIVE",  # ACTIVE, COMPLETED, FAILED, PENDING
             "result": None  # результат в %
         }
+        _set_date_keys(rec, now)
         self.archive["recommendations"].append(rec)
-        self.save_archive()
-        logger.info(f"✅ Добавлена рекомендация: {ticker} {signal}")
+        self._index_rec(rec)
+        self._frame = None
+        self._append_journal([{"op": "add", "rec": rec}])
+        logger.info("✅ Добавлена рекомендация: %s %s", ticker, signal)
+    
+    def _load_prices(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        Загружает котировки тикера для аудита.
+        
+        Через price_store: актуальная Parquet-копия читается без разбора
+        текста, иначе (или если копия не читается) читается CSV и копия
+        пересоздаётся для следующих запусков.
+        
+        Args:
+            ticker: тикер акции
+            
+        Returns:
+            DataFrame с колонками DATE, HIGH, LOW, CLOSE и служебными
+            _day, _high_after, _low_after или None
+        """
+        df = price_store.load_prices(self.data_folder / f"{ticker}_full.csv",
+                                     columns=PRICE_COLUMNS)
+        if df is None:
+            return None
+        return _prepare_prices(df)
     
-    def audit_recommendation(self, ticker: str, rec_date: str) -> Dict:
+    def _data_version(self, ticker: str) -> Optional[int]:
+        """Возвращает время изменения CSV тикера (нс) или None, если файла нет."""
+        try:
+            return (self.data_folder / f"{ticker}_full.csv").stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def audit_recommendation(self, ticker: str, rec_date: str,
+                             df: Optional[pd.DataFrame] = None) -> Dict:
         """
         Проверяет рекомендацию, сравнивая цену в день рекомендации с текущей ценой.
         
@@ -107,45 +511,49 @@ class AuditManager:
         Args:
             ticker: тикер акции
             rec_date: дата рекомендации (ISO format)
+            df: уже загруженные котировки (см. _load_prices); если None - читаются с диска
             
         Returns:
             Результат аудита
         """
         # Загружаем CSV данные
-        csv_path = self.data_folder / f"{ticker}_full.csv"
-        if not csv_path.exists():
+        if df is None:
+            df = self._load_prices(ticker)
+        if df is None:
             return {"status": "ERROR", "message": f"CSV не найден: {ticker}"}
         
-        df = pd.read_csv(csv_path)
-        df['DATE'] = pd.to_datetime(df['DATE'])
-        
         # Находим рекомендацию
-        rec = None
-        for r in self.archive["recommendations"]:
-            if r["ticker"] == ticker and r["date"].split('T')[0] == rec_date.split('T')[0]:
-                rec = r
-                break
+        rec = self._index.get((ticker, rec_date.split('T')[0]))
         
         if not rec:
             return {"status": "ERROR", "message": f"Рекомендация не найдена"}
         
-        # Парсим дату рекомендации
-        rec_date_obj = pd.to_datetime(rec["date"]).date()
+        # Дата рекомендации (без разбора полной ISO строки)
+        rec_date_obj = date.fromisoformat(rec["date_ymd"])
         
         # Получаем цену входа (на дату рекомендации или максимально близко к ней)
         # Фильтруем по году, чтобы не взять старые данные из прошлого года
         rec_year = rec_date_obj.year
-        df_current_year = df[df['DATE'].dt.year == rec_year]
+        rec_day = _to_day(rec_date_obj)
+        year_end = _to_day(f"{rec_year + 1}-01-01")
+        days = df['_day'].to_numpy()
         
-        rec_day_data = df_current_year[df_current_year['DATE'].dt.date == rec_date_obj]
-        if len(rec_day_data) == 0:
+        # Данные отсортированы по дате: строки от даты рекомендации до конца
+        # года - это срез [start, end), границы находятся бинарным поиском
+        start = int(np.searchsorted(days, rec_day))
+        end = int(np.searchsorted(days, year_end))
+        if start >= end:
+            return {"status": "NO_DATA", "message": f"Нет данных для {ticker} на {rec_date_obj}"}
+        
+        if days[start] == rec_day:
+            # Точный день (если строк за день несколько - последняя)
+            entry_idx = int(np.searchsorted(days, rec_day, side='right')) - 1
+        else:
             # Если данных в точный день нет, берём самый близкий день после рекомендации
-            rec_day_data = df_current_year[df_current_year['DATE'].dt.date >= rec_date_obj].head(1)
-            if len(rec_day_data) == 0:
-                return {"status": "NO_DATA", "message": f"Нет данных для {ticker} на {rec_date_obj}"}
+            entry_idx = start
         
-        entry_price_actual = rec_day_data.iloc[-1]['CLOSE']
-        rec_day_actual = rec_day_data.iloc[-1]['DATE'].date()
+        entry_price_actual = float(df['CLOSE'].iat[entry_idx])
+        rec_day_actual = df['DATE'].iat[entry_idx].date()
         
         entry_price = rec.get("entry_price")
         target1 = rec.get("target1")
@@ -157,36 +565,27 @@ class AuditManager:
             return {"status": "ERROR", "message": f"Неполные данные рекомендации"}
         
         # Берём ПОСЛЕДНЮЮ доступную цену (сегодня или последний день торговли)
-        final_price = df_current_year.iloc[-1]['CLOSE']
-        final_date = df_current_year.iloc[-1]['DATE'].date()
+        final_price = float(df['CLOSE'].iat[end - 1])
+        final_date = df['DATE'].iat[end - 1].date()
         
         # Анализируем все данные от даты рекомендации до сегодня (только текущий год)
-        df_period = df_current_year[df_current_year['DATE'].dt.date >= rec_date_obj]
-        
-        hit_target1 = False
-        hit_target2 = False
-        hit_stop_loss = False
-        max_price = entry_price_actual
-        min_price = entry_price_actual
-        
-        for idx, row in df_period.iterrows():
-            high = row['HIGH']
-            low = row['LOW']
-            
-            max_price = max(max_price, high)
-            min_price = min(min_price, low)
-            
-            # Проверяем цели (когда цена впервые достигла уровня)
-            if target1 is not None and high >= target1 and not hit_target1:
-                hit_target1 = True
-            
-            if target2 is not None and high >= target2 and not hit_target2:
-                hit_target2 = True
-            
-            # Проверяем стоп (когда цена впервые упала ниже стопа)
-            if stop_loss is not None and low <= stop_loss and not hit_stop_loss:
-                hit_stop_loss = True
+        if end == len(df):
+            # Период идёт до конца данных - берём готовые суффиксные экстремумы
+            period_high = df['_high_after'].iat[start]
+            period_low = df['_low_after'].iat[start]
+        else:
+            period_high, period_low = _range_extremes(
+                df['HIGH'].to_numpy(), df['LOW'].to_numpy(), start, end
+            )
         
+        # Нужны только факты достижения уровней, а не даты.
+        # Котировки в float32 - уровни приводятся к той же точности
+        hit_target1 = bool(period_high >= np.float32(target1))
+        hit_target2 = bool(period_high >= np.float32(target2))
+        hit_stop_loss = bool(period_low <= np.float32(stop_loss))
+        max_price = max(entry_price_actual, float(period_high))
+        min_price = min(entry_price_actual, float(period_low))
+
         # Считаем результат
         if rec["signal"] == "BUY":
             if hit_stop_loss:
@@ -234,14 +633,62 @@ class AuditManager:
         
         return result
     
-    def audit_all(self) -> List[Dict]:
-        """Проверяет все активные рекомендации."""
-        active_recs = [r for r in self.archive["recommendations"] 
-                      if r["status"] == "ACTIVE"]
+    def audit_all(self, max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Проверяет все активные рекомендации.
+        
+        Котировки тикеров загружаются параллельно (чтение и разбор файлов
+        независимы), сама проверка и обновление архива - в текущем потоке.
+        Незавершённые рекомендации, чей CSV не менялся с прошлого аудита,
+        не перепроверяются: возвращается результат, сохранённый в memo_file
+        (отдельно от архива, чтобы не раздувать журнал).
+        
+        Args:
+            max_workers: число потоков для загрузки котировок (None - по числу CPU)
+            
+        Returns:
+            Список результатов аудита
+        """
+        recs = self.archive["recommendations"]
+        active_mask = (self._recs_frame()["status"] == "ACTIVE").to_numpy()
+        active_recs = [recs[i] for i in np.flatnonzero(active_mask)]
+        
+        # Если CSV тикера не менялся с прошлого аудита, результат рекомендации
+        # тот же - берём сохранённый и котировки не читаем
+        all_tickers = list(dict.fromkeys(r["ticker"] for r in active_recs))
+        versions = {ticker: self._data_version(ticker) for ticker in all_tickers}
+        memo = self._load_memo()
+        
+        def memoized(rec: Dict) -> Optional[Dict]:
+            entry = memo.get(rec["ticker"])
+            version = versions[rec["ticker"]]
+            if entry is None or version is None or entry["mtime_ns"] != version:
+                return None
+            return entry["results"].get(rec["date"])
+        
+        stale_recs = [r for r in active_recs if memoized(r) is None]
+        
+        # Котировки читаются один раз на тикер, а не на каждую рекомендацию
+        tickers = list(dict.fromkeys(r["ticker"] for r in stale_recs))
+        if len(tickers) > 1 and max_workers != 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                df_cache = dict(zip(tickers, executor.map(self._load_prices, tickers)))
+        else:
+            df_cache = {ticker: self._load_prices(ticker) for ticker in tickers}
         
         results = []
+        updates = []
+        new_memo: Dict[str, Dict] = {}
         for rec in active_recs:
-            result = self.audit_recommendation(rec["ticker"], rec["date"])
+            ticker = rec["ticker"]
+            if ticker not in df_cache:
+                result = memoized(rec)
+                results.append(result)
+                new_memo.setdefault(ticker, {"mtime_ns": versions[ticker], "results": {}})[
+                    "results"][rec["date"]] = result
+                continue
+            
+            result = self.audit_recommendation(ticker, rec["date"], df=df_cache[ticker])
             # Пропускаем ошибки и NO_DATA - это означает, что данных еще нет
             if result.get("status") not in ["ERROR", "NO_DATA"]:
                 results.append(result)
@@ -250,23 +697,43 @@ class AuditManager:
                 if result["status"] == "TARGET2_HIT":
                     rec["status"] = "COMPLETED"
                     rec["result"] = result["result_pct"]
+                    fields = {"status": rec["status"], "result": rec["result"]}
                 elif result["status"] == "STOPPED_OUT":
                     rec["status"] = "FAILED"
                     rec["result"] = result["result_pct"]
+                    fields = {"status": rec["status"], "result": rec["result"]}
+                else:
+                    # Незавершённая рекомендация: запоминаем результат до новых данных
+                    if versions[ticker] is not None:
+                        new_memo.setdefault(ticker, {"mtime_ns": versions[ticker], "results": {}})[
+                            "results"][rec["date"]] = result
+                    continue
+                updates.append({
+                    "op": "update",
+                    "ticker": rec["ticker"],
+                    "date": rec["date"],
+                    "fields": fields
+                })
         
-        self.save_archive()
+        if updates:
+            self._frame = None
+        self._append_journal(updates)
+        if new_memo != memo:
+            self._save_memo(new_memo)
         return results
     
     def get_statistics(self) -> Dict:
         """Вычисляет статистику по всем рекомендациям."""
-        all_recs = self.archive["recommendations"]
+        frame = self._recs_frame()
         
-        total = len(all_recs)
-        completed = len([r for r in all_recs if r["status"] == "COMPLETED"])
-        failed = len([r for r in all_recs if r["status"] == "FAILED"])
-        active = len([r for r in all_recs if r["status"] == "ACTIVE"])
+        total = len(frame)
+        counts = frame["status"].value_counts()
+        completed = int(counts.get("COMPLETED", 0))
+        failed = int(counts.get("FAILED", 0))
+        active = int(counts.get("ACTIVE", 0))
         
-        profits = [r["result"] for r in all_recs if r["result"] is not None]
+        profits = frame["result"].dropna()
+        has_profits = len(profits) > 0
         
         stats = {
             "total_recommendations": total,
@@ -274,15 +741,17 @@ class AuditManager:
             "failed": failed,
             "active": active,
             "success_rate": round((completed / total * 100) if total > 0 else 0, 2),
-            "avg_profit": round(sum(profits) / len(profits), 2) if profits else 0,
-            "max_profit": round(max(profits), 2) if profits else 0,
-            "min_profit": round(min(profits), 2) if profits else 0
+            "avg_profit": round(float(profits.mean()), 2) if has_profits else 0,
+            "max_profit": round(float(profits.max()), 2) if has_profits else 0,
+            "min_profit": round(float(profits.min()), 2) if has_profits else 0
         }
         
         return stats
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # Тестирование
     audit = AuditManager()
     
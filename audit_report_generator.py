@@ -5,435 +5,556 @@
 """
 
 import json
+import os
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List
+from types import MappingProxyType
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 
+from audit_manager import iter_archive
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Периодичность аудита (для строки "Следующий аудит" в отчёте)
+AUDIT_INTERVAL_DAYS = 7
 
-class AuditReportGenerator:
-    """Генератор HTML отчётов аудита."""
-    
-    def __init__(self, archive_file: str = "recommendations_archive.json",
-                 output_folder: str = "analysis_history"):
-        self.archive_file = Path(archive_file)
-        self.output_folder = Path(output_folder)
-        self.output_folder.mkdir(exist_ok=True)
-    
-    def _load_archive(self) -> Dict:
-        """Загружает архив рекомендаций."""
-        if self.archive_file.exists():
-            with open(self.archive_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"recommendations": []}
-    
-    def _calculate_stats(self, recs: List[Dict]) -> Dict:
-        """Вычисляет статистику."""
-        completed = [r for r in recs if r.get("status") == "COMPLETED"]
-        failed = [r for r in recs if r.get("status") == "FAILED"]
-        active = [r for r in recs if r.get("status") == "ACTIVE"]
-        
-        profits = [r.get("result", 0) for r in completed + failed if r.get("result") is not None]
-        
-        return {
-            "total": len(recs),
-            "completed": len(completed),
-            "failed": len(failed),
-            "active": len(active),
-            "success_rate": round((len(completed) / len(recs) * 100) if recs else 0, 1),
-            "avg_profit": round(sum(profits) / len(profits), 2) if profits else 0,
-            "max_profit": round(max(profits), 2) if profits and len(profits) > 0 else 0,
-            "min_profit": round(min(profits), 2) if profits and len(profits) > 0 else 0
-        }
-    
-    def _get_status_badge(self, status: str) -> str:
-        """Возвращает HTML для статуса."""
-        badges = {
-            "COMPLETED": '<span class="badge badge-success">✅ ВЫПОЛНЕНА</span>',
-            "FAILED": '<span class="badge badge-danger">❌ ПРОВАЛЕНА</span>',
-            "ACTIVE": '<span class="badge badge-warning">🟡 АКТИВНА</span>',
-            "IN_PROGRESS": '<span class="badge badge-info">⏳ В ПРОЦЕССЕ</span>',
-            "TARGET1_HIT": '<span class="badge badge-info">🎯 ЦЕЛЬ 1</span>',
-            "TARGET2_HIT": '<span class="badge badge-success">🎯🎯 ЦЕЛЬ 2</span>',
-            "STOPPED_OUT": '<span class="badge badge-danger">🛑 СТОП</span>',
-        }
-        return badges.get(status, f'<span class="badge">{status}</span>')
-    
-    def _get_result_color(self, result_pct: float) -> str:
-        """Возвращает цвет для результата."""
-        if result_pct is None:
-            result_pct = 0
-        
-        if result_pct > 0:
-            return f'<span class="positive">{result_pct:+.2f}%</span>'
-        elif result_pct < 0:
-            return f'<span class="negative">{result_pct:.2f}%</span>'
-        else:
-            return '<span class="neutral">0.00%</span>'
-    
-    def generate_html(self) -> str:
-        """Генерирует HTML отчёт."""
-        archive = self._load_archive()
-        recs = archive.get("recommendations", [])
-        stats = self._calculate_stats(recs)
-        
-        # Группируем по статусам
-        completed = [r for r in recs if r.get("status") == "COMPLETED"]
-        failed = [r for r in recs if r.get("status") == "FAILED"]
-        active = [r for r in recs if r.get("status") == "ACTIVE"]
-        
-        html = f"""<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Аудит Рекомендаций - {datetime.now().strftime('%d.%m.%Y')}</title>
-    <style>
-        * {{
+# Файл с подписью архива, по которому построен последний отчёт
+SIGNATURE_FILE = ".audit.sig"
+
+# Стили отчёта (не зависят от данных, собираются один раз при импорте)
+_REPORT_CSS = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
             color: #333;
             line-height: 1.6;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             padding: 20px;
-        }}
+        }
         
-        header {{
+        header {
             background: white;
             padding: 30px;
             border-radius: 10px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
             margin-bottom: 30px;
             text-align: center;
-        }}
+        }
         
-        h1 {{
+        h1 {
             color: #1e3c72;
             margin-bottom: 10px;
             font-size: 2.5em;
-        }}
+        }
         
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 15px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .stat-box {{
+        .stat-box {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px;
             border-radius: 10px;
             text-align: center;
-        }}
+        }
         
-        .stat-box h3 {{
+        .stat-box h3 {
             font-size: 0.9em;
             opacity: 0.9;
             margin-bottom: 8px;
-        }}
+        }
         
-        .stat-box .number {{
+        .stat-box .number {
             font-size: 2em;
             font-weight: bold;
-        }}
+        }
         
-        section {{
+        section {
             background: white;
             margin-bottom: 30px;
             border-radius: 10px;
             overflow: hidden;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
+        }
         
-        section h2 {{
+        section h2 {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px;
             margin: 0;
             font-size: 1.8em;
-        }}
+        }
         
-        .section-content {{
+        .section-content {
             padding: 30px;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
-        }}
+        }
         
-        th {{
+        th {
             background: #667eea;
             color: white;
             padding: 12px;
             text-align: left;
             font-weight: 600;
-        }}
+        }
         
-        td {{
+        td {
             padding: 12px;
             border-bottom: 1px solid #e5e7eb;
-        }}
+        }
         
-        tr:hover {{
+        tr:hover {
             background: #f8f9fa;
-        }}
+        }
         
-        .badge {{
+        .badge {
             display: inline-block;
             padding: 5px 10px;
             border-radius: 3px;
             font-size: 0.8em;
             font-weight: 600;
-        }}
+        }
         
-        .badge-success {{
+        .badge-success {
             background: #dcfce7;
             color: #166534;
-        }}
+        }
         
-        .badge-danger {{
+        .badge-danger {
             background: #fee2e2;
             color: #991b1b;
-        }}
+        }
         
-        .badge-warning {{
+        .badge-warning {
             background: #fef3c7;
             color: #92400e;
-        }}
+        }
         
-        .badge-info {{
+        .badge-info {
             background: #dbeafe;
             color: #1e40af;
-        }}
+        }
         
-        .positive {{
+        .positive {
             color: #22c55e;
             font-weight: bold;
-        }}
+        }
         
-        .negative {{
+        .negative {
             color: #ef4444;
             font-weight: bold;
-        }}
+        }
         
-        .neutral {{
+        .neutral {
             color: #666;
             font-weight: bold;
-        }}
+        }
         
-        .rec-card {{
+        .rec-card {
             background: #f8f9fa;
             border-left: 4px solid #667eea;
             padding: 15px;
             margin-bottom: 15px;
             border-radius: 5px;
-        }}
+        }
         
-        .rec-header {{
+        .rec-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 10px;
             flex-wrap: wrap;
             gap: 10px;
-        }}
+        }
         
-        .ticker {{
+        .ticker {
             font-size: 1.3em;
             font-weight: bold;
             color: #1e3c72;
-        }}
+        }
         
-        .rec-details {{
+        .rec-details {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
             gap: 10px;
             font-size: 0.9em;
-        }}
+        }
         
-        .detail {{
+        .detail {
             background: white;
             padding: 10px;
             border-radius: 3px;
             border-left: 3px solid #667eea;
-        }}
+        }
         
-        .detail-label {{
+        .detail-label {
             color: #666;
             font-size: 0.8em;
             font-weight: 600;
-        }}
+        }
         
-        .detail-value {{
+        .detail-value {
             color: #1e3c72;
             font-weight: bold;
             margin-top: 3px;
-        }}
+        }
         
-        footer {{
+        footer {
             background: white;
             padding: 20px;
             text-align: center;
             border-radius: 10px;
             color: #666;
             font-size: 0.9em;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            h1 {{
+        @media (max-width: 768px) {
+            h1 {
                 font-size: 1.8em;
-            }}
+            }
             
-            .stats-grid {{
+            .stats-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .rec-details {{
+            .rec-details {
                 grid-template-columns: repeat(2, 1fr);
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+
+# HTML бейджи статусов рекомендаций и результатов аудита
+_STATUS_BADGES = MappingProxyType({
+    "COMPLETED": '<span class="badge badge-success">✅ ВЫПОЛНЕНА</span>',
+    "FAILED": '<span class="badge badge-danger">❌ ПРОВАЛЕНА</span>',
+    "ACTIVE": '<span class="badge badge-warning">🟡 АКТИВНА</span>',
+    "IN_PROGRESS": '<span class="badge badge-info">⏳ В ПРОЦЕССЕ</span>',
+    "TARGET1_HIT": '<span class="badge badge-info">🎯 ЦЕЛЬ 1</span>',
+    "TARGET2_HIT": '<span class="badge badge-success">🎯🎯 ЦЕЛЬ 2</span>',
+    "STOPPED_OUT": '<span class="badge badge-danger">🛑 СТОП</span>',
+})
+
+# Каркас отчёта: заполняется через format_map в generate_html
+_REPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Аудит Рекомендаций - {date}</title>
+    <style>
+{css}    </style>
 </head>
 <body>
     <div class="container">
         <header>
             <h1>📊 Аудит Торговых Рекомендаций</h1>
-            <p>📅 Дата отчёта: {datetime.now().strftime('%d.%m.%Y %H:%M')}</p>
-            <p>📈 Всего рекомендаций: {stats['total']}</p>
+            <p>📅 Дата отчёта: {datetime}</p>
+            <p>📈 Всего рекомендаций: {total}</p>
         </header>
         
         <div class="stats-grid">
             <div class="stat-box">
                 <h3>✅ Выполнено</h3>
-                <div class="number">{stats['completed']}</div>
+                <div class="number">{completed}</div>
             </div>
             <div class="stat-box">
                 <h3>❌ Провалено</h3>
-                <div class="number">{stats['failed']}</div>
+                <div class="number">{failed}</div>
             </div>
             <div class="stat-box">
                 <h3>🟡 Активно</h3>
-                <div class="number">{stats['active']}</div>
+                <div class="number">{active}</div>
             </div>
             <div class="stat-box">
                 <h3>📈 Процент успеха</h3>
-                <div class="number">{stats['success_rate']}%</div>
+                <div class="number">{success_rate}%</div>
             </div>
             <div class="stat-box">
                 <h3>💰 Средний результат</h3>
-                <div class="number">{stats['avg_profit']:+.2f}%</div>
+                <div class="number">{avg_profit:+.2f}%</div>
             </div>
             <div class="stat-box">
                 <h3>🎯 Максимум</h3>
-                <div class="number">{stats['max_profit']:+.2f}%</div>
+                <div class="number">{max_profit:+.2f}%</div>
             </div>
         </div>
         
         <!-- ВЫПОЛНЕННЫЕ -->
         <section>
-            <h2>✅ Выполненные рекомендации ({len(completed)})</h2>
+            <h2>✅ Выполненные рекомендации ({completed_n})</h2>
             <div class="section-content">
-                {self._render_recs_html(completed) if completed else '<p>Нет выполненных рекомендаций</p>'}
+                {completed_html}
             </div>
         </section>
         
         <!-- АКТИВНЫЕ -->
         <section>
-            <h2>🟡 Активные рекомендации ({len(active)})</h2>
+            <h2>🟡 Активные рекомендации ({active_n})</h2>
             <div class="section-content">
-                {self._render_recs_html(active) if active else '<p>Нет активных рекомендаций</p>'}
+                {active_html}
             </div>
         </section>
         
         <!-- ПРОВАЛЕНЫ -->
         <section>
-            <h2>❌ Провалены рекомендации ({len(failed)})</h2>
+            <h2>❌ Провалены рекомендации ({failed_n})</h2>
             <div class="section-content">
-                {self._render_recs_html(failed) if failed else '<p>Нет провалены рекомендаций</p>'}
+                {failed_html}
             </div>
         </section>
         
         <footer>
             <p>🔍 Аудит создан автоматически системой анализа акций</p>
-            <p>📌 Следующий аудит: {(datetime.now()).strftime('%d.%m.%Y')}</p>
+            <p>📌 Следующий аудит: {next_audit}</p>
         </footer>
     </div>
 </body>
 </html>"""
-        return html
+
+
+def _fmt_value(value, fmt: str = '') -> str:
+    """Форматирует значение поля рекомендации; отсутствующее - прочерк."""
+    if value is None or value == '':
+        return '—'
+    return format(value, fmt)
+
+
+def _detail(label: str, value: str) -> str:
+    """Возвращает HTML блока "подпись - значение" карточки рекомендации."""
+    return f"""
+                    <div class="detail">
+                        <div class="detail-label">{label}</div>
+                        <div class="detail-value">{value}</div>
+                    </div>"""
+
+
+class AuditReportGenerator:
+    """Генератор HTML отчётов аудита."""
+    
+    def __init__(self, archive_file: str = "recommendations_archive.json",
+                 output_folder: str = "analysis_history"):
+        self.archive_file = Path(archive_file)
+        self.output_folder = Path(output_folder)
+        self.output_folder.mkdir(exist_ok=True)
+    
+    def _partition_and_stats(self, recs: Iterable[Dict]) -> Tuple[Dict, Dict[str, List[Dict]]]:
+        """
+        Группирует рекомендации по статусам и считает статистику за один проход.
+        
+        Рекомендации с другими статусами только учитываются в общем числе
+        и не сохраняются, поэтому recs может быть потоковым итератором.
+        
+        Args:
+            recs: рекомендации из архива (список или итератор)
+            
+        Returns:
+            (статистика, {"COMPLETED": [...], "FAILED": [...], "ACTIVE": [...]})
+        """
+        buckets = {"COMPLETED": [], "FAILED": [], "ACTIVE": []}
+        count = 0
+        
+        # Результаты завершённых: количество, сумма, минимум, максимум
+        n = 0
+        total = 0
+        mn = float('inf')
+        mx = float('-inf')
+        
+        for r in recs:
+            count += 1
+            status = r.get("status")
+            bucket = buckets.get(status)
+            if bucket is None:
+                continue
+            bucket.append(r)
+            if status == "COMPLETED" or status == "FAILED":
+                result = r.get("result")
+                if result is not None:
+                    n += 1
+                    total += result
+                    if result < mn:
+                        mn = result
+                    if result > mx:
+                        mx = result
+        
+        completed_n = len(buckets["COMPLETED"])
+        stats = {
+            "total": count,
+            "completed": completed_n,
+            "failed": len(buckets["FAILED"]),
+            "active": len(buckets["ACTIVE"]),
+            "success_rate": round((completed_n / count * 100) if count else 0, 1),
+            "avg_profit": round(total / n, 2) if n else 0,
+            "max_profit": round(mx, 2) if n else 0,
+            "min_profit": round(mn, 2) if n else 0
+        }
+        return stats, buckets
+    
+    def _get_status_badge(self, status: str) -> str:
+        """Возвращает HTML для статуса."""
+        return _STATUS_BADGES.get(status, f'<span class="badge">{status}</span>')
+    
+    def _get_result_color(self, result_pct: float) -> str:
+        """Возвращает цвет для результата."""
+        if result_pct is None:
+            result_pct = 0
+        
+        if result_pct > 0:
+            return f'<span class="positive">{result_pct:+.2f}%</span>'
+        elif result_pct < 0:
+            return f'<span class="negative">{result_pct:.2f}%</span>'
+        else:
+            return '<span class="neutral">0.00%</span>'
+    
+    def generate_html(self, now: Optional[datetime] = None) -> str:
+        """
+        Генерирует HTML отчёт.
+        
+        Args:
+            now: момент создания отчёта (по умолчанию - текущее время)
+            
+        Returns:
+            HTML документ
+        """
+        if now is None:
+            now = datetime.now()
+        # Архив читается потоково: в памяти остаются только три группы
+        stats, buckets = self._partition_and_stats(iter_archive(self.archive_file))
+        completed = buckets["COMPLETED"]
+        failed = buckets["FAILED"]
+        active = buckets["ACTIVE"]
+        
+        date_str = now.strftime('%d.%m.%Y')
+        ctx = {
+            "date": date_str,
+            "datetime": now.strftime('%d.%m.%Y %H:%M'),
+            "css": _REPORT_CSS,
+            "total": stats['total'],
+            "completed": stats['completed'],
+            "failed": stats['failed'],
+            "active": stats['active'],
+            "success_rate": stats['success_rate'],
+            "avg_profit": stats['avg_profit'],
+            "max_profit": stats['max_profit'],
+            "completed_n": len(completed),
+            "completed_html": self._render_recs_html(completed) if completed else '<p>Нет выполненных рекомендаций</p>',
+            "active_n": len(active),
+            "active_html": self._render_recs_html(active) if active else '<p>Нет активных рекомендаций</p>',
+            "failed_n": len(failed),
+            "failed_html": self._render_recs_html(failed) if failed else '<p>Нет провалены рекомендаций</p>',
+            "next_audit": (now + timedelta(days=AUDIT_INTERVAL_DAYS)).strftime('%d.%m.%Y'),
+        }
+        return _REPORT_TEMPLATE.format_map(ctx)
     
     def _render_recs_html(self, recs: List[Dict]) -> str:
         """Рендерит HTML для рекомендаций."""
-        html = ""
+        parts = []
+        append = parts.append
+        get_badge = self._get_status_badge
+        get_result = self._get_result_color
         for rec in recs:
-            result_pct = rec.get("result", 0)
-            status = rec.get("status", "UNKNOWN")
+            # Каждое поле читается один раз
+            g = rec.get
+            comment = g("comment")
+            details = "".join((
+                _detail('Дата', _fmt_value(g('date_ymd'))),
+                _detail('Сигнал', _fmt_value(g('signal'))),
+                _detail('Цена входа', f"{_fmt_value(g('entry_price'), '.2f')} ₽"),
+                _detail('Цель 1 / 2', f"{_fmt_value(g('target1'), '.2f')} / {_fmt_value(g('target2'), '.2f')} ₽"),
+                _detail('Стоп-лосс', f"{_fmt_value(g('stop_loss'), '.2f')} ₽"),
+                _detail('RSI / Тренд', f"{_fmt_value(g('rsi'), '.2f')} / {_fmt_value(g('trend'))}"),
+            ))
             
-            html += f"""
+            append(f"""
             <div class="rec-card">
                 <div class="rec-header">
-                    <span class="ticker">{rec.get('ticker', 'N/A')}</span>
-                    {self._get_status_badge(status)}
-                    {self._get_result_color(result_pct)}
+                    <span class="ticker">{g('ticker', 'N/A')}</span>
+                    {get_badge(g('status', 'UNKNOWN'))}
+                    {get_result(g('result', 0))}
                 </div>
-                <div class="rec-details">
-                    <div class="detail">
-                        <div class="detail-label">Дата</div>
-                        <div class="detail-value">{rec.get('date', 'N/A')[:10]}</div>
-                    </div>
-                    <div class="detail">
-                        <div class="detail-label">Сигнал</div>
-                        <div class="detail-value">{rec.get('signal', 'N/A')}</div>
-                    </div>
-                    <div class="detail">
-                        <div class="detail-label">Цена входа</div>
-                        <div class="detail-value">{rec.get('entry_price', 0):.2f} ₽</div>
-                    </div>
-                    <div class="detail">
-                        <div class="detail-label">Цель 1 / 2</div>
-                        <div class="detail-value">{rec.get('target1', 0):.2f} / {rec.get('target2', 0):.2f} ₽</div>
-                    </div>
-                    <div class="detail">
-                        <div class="detail-label">Стоп-лосс</div>
-                        <div class="detail-value">{rec.get('stop_loss', 0):.2f} ₽</div>
-                    </div>
-                    <div class="detail">
-                        <div class="detail-label">RSI / Тренд</div>
-                        <div class="detail-value">{rec.get('rsi', 0):.2f} / {rec.get('trend', 'N/A')}</div>
-                    </div>
+                <div class="rec-details">{details}
                 </div>
-                {f'<p style="margin-top: 10px; color: #666; font-size: 0.9em;"><strong>💬</strong> {rec.get("comment", "")}</p>' if rec.get("comment") else ""}
+                {f'<p style="margin-top: 10px; color: #666; font-size: 0.9em;"><strong>💬</strong> {comment}</p>' if comment else ""}
             </div>
-            """
+            """)
         
-        return html
+        return "".join(parts)
+    
+    def _archive_signature(self) -> List[Optional[List[int]]]:
+        """
+        Возвращает подпись снимка архива и журнала.
+        
+        Returns:
+            Список из двух элементов: [mtime_ns, размер] файла или None, если
+            файла нет. Список, а не кортеж - подпись сравнивается с сохранённой в JSON
+        """
+        signature = []
+        for path in (self.archive_file, self.archive_file.with_suffix('.jsonl')):
+            try:
+                st = path.stat()
+                signature.append([st.st_mtime_ns, st.st_size])
+            except FileNotFoundError:
+                signature.append(None)
+        return signature
     
-    def save_report(self):
-        """Сохраняет отчёт в HTML файл."""
-        html = self.generate_html()
+    def save_report(self, force: bool = False):
+        """
+        Сохраняет отчёт в HTML файл.
         
-        filename = f"AUDIT_REPORT_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        Если архив не менялся с прошлого отчёта и тот отчёт на месте,
+        новый не создаётся - возвращается путь к прошлому.
+        
+        Args:
+            force: создать отчёт, даже если архив не менялся
+            
+        Returns:
+            Путь к файлу отчёта
+        """
+        sig_file = self.output_folder / SIGNATURE_FILE
+        signature = self._archive_signature()
+        if not force and sig_file.exists():
+            try:
+                last = json.loads(sig_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                last = {}
+            if last.get("signature") == signature and Path(last.get("report", "")).is_file():
+                logger.info("Архив не изменился, отчёт актуален: %s", last["report"])
+                return last["report"]
+        
+        now = datetime.now()
+        html = self.generate_html(now=now)
+        
+        filename = f"AUDIT_REPORT_{now.strftime('%Y%m%d_%H%M%S')}.html"
         filepath = self.output_folder / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # Пишем во временный файл и атомарно переименовываем:
+        # читатель никогда не увидит недописанный отчёт
+        tmp_path = filepath.with_suffix('.html.tmp')
+        tmp_path.write_bytes(html.encode('utf-8'))
+        os.replace(tmp_path, filepath)
+        
+        sig_file.write_text(json.dumps({"signature": signature, "report": str(filepath)}),
+                            encoding='utf-8')
         
         logger.info(f"✅ Отчёт сохранён: {filepath}")
         return str(filepath)
@@ -3,6 +3,7 @@
 
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 tickers_to_test = ['RUS-YDEX', 'YDEX', 'YNDX', 'YANDEX']
 
@@ -10,14 +11,15 @@ print("\n" + "="*60)
 print("🔍 ПРОВЕРКА ЯНДЕКСА НА МОСБИРЖЕ API")
 print("="*60 + "\n")
 
-found = False
+session = requests.Session()
+
 
-for ticker in tickers_to_test:
+def probe(ticker):
+    """Запрашивает историю тикера; возвращает (текст результата, найден ли)."""
     url = f"https://iss.moex.com/iss/history/engines/stock/markets/shares/securities/{ticker}.json"
     
     try:
-        print(f"Проверяю {ticker}...", end=" ")
-        r = requests.get(url, timeout=5, params={'limit': 1})
+        r = session.get(url, timeout=5, params={'limit': 1})
         
         if r.status_code == 200:
             data = r.json()
@@ -25,19 +27,31 @@ for ticker in tickers_to_test:
             if 'history' in data:
                 records = data['history'].get('data', [])
                 if records:
-                    print(f"✅ НАЙДЕН! ({len(records)} записей)")
-                    found = True
-                    print(f"\nРезультат: используйте тикер '{ticker}'")
-                    break
+                    return f"✅ НАЙДЕН! ({len(records)} записей)", True
                 else:
-                    print("⚠️ Есть, но нет данных")
+                    return "⚠️ Есть, но нет данных", False
             else:
-                print("⚠️ Неправильный ответ")
+                return "⚠️ Неправильный ответ", False
         else:
-            print(f"❌ Ошибка {r.status_code}")
+            return f"❌ Ошибка {r.status_code}", False
             
     except Exception as e:
-        print(f"❌ {type(e).__name__}")
+        return f"❌ {type(e).__name__}", False
+
+
+# Все тикеры проверяются параллельно (одно соединение на поток через общую сессию),
+# результаты выводятся в исходном порядке
+with ThreadPoolExecutor(max_workers=len(tickers_to_test)) as executor:
+    results = list(executor.map(probe, tickers_to_test))
+
+found = False
+
+for ticker, (message, ok) in zip(tickers_to_test, results):
+    print(f"Проверяю {ticker}... {message}")
+    if ok:
+        found = True
+        print(f"\nРезультат: используйте тикер '{ticker}'")
+        break
 
 if not found:
     print("\n❌ Яндекс не найден ни под одним из тикеров!")
@@ -2,13 +2,27 @@
 Утилита для анализа данных акций
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
 from stock_data_manager import StockDataManager
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Папки, уже созданные в этом процессе (mkdir вызывается один раз на папку)
+_ENSURED_DIRS: Set[str] = set()
+
+
+def _ensure_dir(folder: str) -> Path:
+    """Создаёт папку при первом обращении к ней и возвращает её путь."""
+    path = Path(folder)
+    if folder not in _ENSURED_DIRS:
+        path.mkdir(exist_ok=True)
+        _ENSURED_DIRS.add(folder)
+    return path
+
 
 class DataAnalyzer:
     """Анализатор данных акций."""
@@ -16,6 +30,69 @@ class DataAnalyzer:
     def __init__(self):
         """Инициализация анализатора."""
         self.manager = StockDataManager()
+        # ticker -> (mtime_ns CSV, DataFrame с индикаторами)
+        self._enriched: Dict[str, Tuple[int, pd.DataFrame]] = {}
+    
+    @staticmethod
+    def _enrich(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Добавляет к данным производные колонки за один проход по CLOSE.
+        
+        Args:
+            df: DataFrame с данными акции
+            
+        Returns:
+            Новый DataFrame с колонками MA20, MA50, CHANGE, CHANGE_PCT
+        """
+        close_s = df['CLOSE']
+        close = close_s.to_numpy(dtype=float)
+        
+        change = np.empty_like(close)
+        change_pct = np.empty_like(close)
+        change[:1] = np.nan
+        change_pct[:1] = np.nan
+        change[1:] = close[1:] - close[:-1]
+        change_pct[1:] = (close[1:] / close[:-1] - 1) * 100
+        
+        return df.assign(
+            MA20=close_s.rolling(window=20).mean(),
+            MA50=close_s.rolling(window=50).mean(),
+            CHANGE=change,
+            CHANGE_PCT=change_pct,
+        )
+    
+    def _get_enriched(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        Возвращает данные тикера с индикаторами (см. _enrich).
+        
+        Результат кэшируется до изменения CSV файла тикера, поэтому
+        повторные вызовы методов анализатора не перечитывают данные.
+        Возвращаемый DataFrame общий - изменять его нельзя.
+        
+        Args:
+            ticker: Тикер акции
+            
+        Returns:
+            DataFrame или None, если данных нет
+        """
+        try:
+            mtime_ns = self.manager._get_csv_path(ticker).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        
+        cached = self._enriched.get(ticker)
+        if cached is not None and mtime_ns is not None and cached[0] == mtime_ns:
+            return cached[1]
+        
+        df = self.manager.get_data(ticker)
+        if df is None or df.empty:
+            self._enriched.pop(ticker, None)
+            return None
+        
+        enriched = self._enrich(df)
+        if mtime_ns is not None:
+            self._enriched[ticker] = (mtime_ns, enriched)
+        return enriched
     
     def get_daily_changes(self, ticker: str) -> pd.DataFrame:
         """
@@ -27,15 +104,11 @@ class DataAnalyzer:
         Returns:
             DataFrame с колонками: DATE, CLOSE, CHANGE, CHANGE_PCT
         """
-        df = self.manager.get_data(ticker)
+        df = self._get_enriched(ticker)
         
-        if df is None or df.empty:
+        if df is None:
             return pd.DataFrame()
         
-        df = df.copy()
-        df['CHANGE'] = df['CLOSE'].diff()
-        df['CHANGE_PCT'] = df['CLOSE'].pct_change() * 100
-        
         return df[['DATE', 'CLOSE', 'CHANGE', 'CHANGE_PCT']]
     
     def get_volatility(self, ticker: str, window: int = 20) -> float:
@@ -49,15 +122,18 @@ class DataAnalyzer:
         Returns:
             Волатильность в процентах
         """
-        df = self.manager.get_data(ticker)
+        df = self._get_enriched(ticker)
         
-        if df is None or df.empty or len(df) < window:
+        if df is None or len(df) < window:
             return 0.0
         
-        returns = df['CLOSE'].pct_change()
-        volatility = returns.tail(window).std() * 100
+        # Нужны только последние window доходностей: берём window + 1 цен
+        close = df['CLOSE'].to_numpy(dtype=float)[-(window + 1):]
+        returns = np.diff(close) / close[:-1]
+        if len(returns) < 2:
+            return float('nan')
         
-        return volatility
+        return float(returns.std(ddof=1) * 100)
     
     def get_moving_average(
         self, 
@@ -74,15 +150,19 @@ class DataAnalyzer:
         Returns:
             DataFrame с колонками: DATE, CLOSE, MA
         """
-        df = self.manager.get_data(ticker)
+        df = self._get_enriched(ticker)
         
-        if df is None or df.empty:
+        if df is None:
             return pd.DataFrame()
         
-        df = df.copy()
-        df['MA'] = df['CLOSE'].rolling(window=window).mean()
+        # MA20 / MA50 уже посчитаны в _enrich
+        ma_column = f'MA{window}'
+        if ma_column in df.columns:
+            ma = df[ma_column]
+        else:
+            ma = df['CLOSE'].rolling(window=window).mean()
         
-        return df[['DATE', 'CLOSE', 'MA']].dropna()
+        return pd.DataFrame({'DATE': df['DATE'], 'CLOSE': df['CLOSE'], 'MA': ma}).dropna()
     
     def get_price_range(self, ticker: str) -> dict:
         """
@@ -94,9 +174,9 @@ class DataAnalyzer:
         Returns:
             Словарь с информацией о диапазоне
         """
-        df = self.manager.get_data(ticker)
+        df = self._get_enriched(ticker)
         
-        if df is None or df.empty:
+        if df is None:
             return {}
         
         return {
@@ -119,23 +199,45 @@ class DataAnalyzer:
         Returns:
             DataFrame для сравнения
         """
-        data = []
+        # Колонки результата заполняются по тикерам (один проход по данным
+        # каждого тикера), форматирование - векторно при сборке DataFrame
+        n = len(tickers)
+        names = []
+        counts = np.empty(n, dtype=np.int64)
+        avg = np.empty(n)
+        low = np.empty(n)
+        high = np.empty(n)
+        vol = np.empty(n)
+        volume = np.empty(n)
         
+        i = 0
         for ticker in tickers:
-            stats = self.manager.get_statistics(ticker)
-            if stats:
-                volatility = self.get_volatility(ticker)
-                data.append({
-                    'Тикер': ticker,
-                    'Записей': stats['total_records'],
-                    'Ср. цена': f"{stats['avg_price']:.2f}",
-                    'Мин': f"{stats['min_price']:.2f}",
-                    'Макс': f"{stats['max_price']:.2f}",
-                    'Волатильность': f"{volatility:.2f}%",
-                    'Объем': f"{stats['total_volume']:,.0f}"
-                })
-        
-        return pd.DataFrame(data)
+            df = self._get_enriched(ticker)
+            if df is None:
+                continue
+            close = df['CLOSE'].to_numpy(dtype=float)
+            names.append(ticker)
+            counts[i] = len(close)
+            avg[i] = close.mean()
+            low[i] = close.min()
+            high[i] = close.max()
+            vol[i] = self.get_volatility(ticker)
+            volume[i] = df['VOLUME'].sum()
+            i += 1
+        
+        if i == 0:
+            return pd.DataFrame()
+        
+        fmt_price = '{:.2f}'.format
+        return pd.DataFrame({
+            'Тикер': names,
+            'Записей': counts[:i],
+            'Ср. цена': pd.Series(avg[:i]).map(fmt_price),
+            'Мин': pd.Series(low[:i]).map(fmt_price),
+            'Макс': pd.Series(high[:i]).map(fmt_price),
+            'Волатильность': pd.Series(vol[:i]).map('{:.2f}%'.format),
+            'Объем': pd.Series(volume[:i]).map('{:,.0f}'.format),
+        })
     
     def export_comparison(self, tickers: list, filename: str = "comparison.csv"):
         """
@@ -161,22 +263,15 @@ class DataAnalyzer:
             ticker: Тикер акции
             output_dir: Директория для сохранения
         """
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+        output_path = _ensure_dir(output_dir)
         
-        df = self.manager.get_data(ticker)
+        # Данные с техническими индикаторами
+        df_export = self._get_enriched(ticker)
         
-        if df is None or df.empty:
+        if df_export is None:
             logger.warning(f"Данные для {ticker} не найдены")
             return
         
-        # Добавляем технические индикаторы
-        df_export = df.copy()
-        df_export['MA20'] = df['CLOSE'].rolling(window=20).mean()
-        df_export['MA50'] = df['CLOSE'].rolling(window=50).mean()
-        df_export['CHANGE'] = df['CLOSE'].diff()
-        df_export['CHANGE_PCT'] = df['CLOSE'].pct_change() * 100
-        
         # Сохраняем
         filename = output_path / f"{ticker}_analysis.csv"
         df_export.to_csv(filename, index=False, encoding='utf-8-sig')
@@ -5,91 +5,410 @@
 2. Удаление строк с VOLUME=0 (дни без торговли)
 """
 
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import logging
 
+import price_store
+
+# pyarrow (опционально) - быстрый парсер CSV и режим --parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# polars (опционально) - потоковая очистка через lazy API (режим --polars)
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+# Колонки котировок, которые читает и сохраняет скрипт
+PRICE_COLUMNS = ['DATE', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
+
+# Явные типы цен: парсер не угадывает тип колонок. Цены остаются float64 -
+# файл перезаписывается, и float32 исказил бы цены с 8+ значащими цифрами.
+# VOLUME для парсера C не задаём: to_csv записал бы целые объемы с ".0"
+PRICE_DTYPES = {'OPEN': 'float64', 'HIGH': 'float64', 'LOW': 'float64', 'CLOSE': 'float64'}
+
+# CSV меньше этого размера исправляются модулем csv, без pandas
+SMALL_CSV_BYTES = 64 * 1024
+
+# Реестр уже исправленных файлов: имя файла -> st_mtime_ns после очистки
+CLEANED_REGISTRY = ".cleaned.json"
+
+
+def _load_registry(data_dir: Path) -> Dict[str, int]:
+    """Загружает реестр исправленных файлов (пустой, если его нет)."""
+    try:
+        with open(data_dir / CLEANED_REGISTRY, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_registry(data_dir: Path, registry: Dict[str, int]):
+    """Сохраняет реестр исправленных файлов."""
+    with open(data_dir / CLEANED_REGISTRY, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2, sort_keys=True)
+
+
+def _read_prices(path: Path) -> pd.DataFrame:
+    """
+    Читает котировки из CSV (в т.ч. *.csv.gz) или Parquet (по расширению файла).
+    
+    Args:
+        path: путь к *.csv, *.csv.gz или *.parquet файлу
+        
+    Returns:
+        DataFrame с котировками
+    """
+    if path.suffix == '.parquet':
+        # Parquet хранит типы - читаем только нужные колонки, без разбора текста
+        return pd.read_parquet(path, columns=PRICE_COLUMNS)
+    # Читаем только колонки котировок (их пишет StockDataManager)
+    if PYARROW_AVAILABLE:
+        # Многопоточный парсер pyarrow: даты и числа разбираются в C++.
+        # VOLUME задаём явно: при частичном dtype pandas приводит остальные
+        # колонки к int и падает на пропусках. Запись через pyarrow выводит
+        # целые float без ".0"
+        return pd.read_csv(path, engine='pyarrow', usecols=PRICE_COLUMNS,
+                           dtype={**PRICE_DTYPES, 'VOLUME': 'float64'},
+                           parse_dates=['DATE'])
+    return pd.read_csv(path, engine='c', usecols=PRICE_COLUMNS, dtype=PRICE_DTYPES,
+                       parse_dates=['DATE'], cache_dates=True)
+
+
+def _write_prices(df: pd.DataFrame, path: Path):
+    """
+    Сохраняет котировки в формат, соответствующий расширению файла.
+    
+    Args:
+        df: DataFrame с котировками
+        path: путь к *.csv, *.csv.gz или *.parquet файлу
+    """
+    if path.suffix == '.parquet':
+        price_store.write_parquet(df, path)
+        return
+    
+    # Пишем во временный файл и подменяем исходный: прерванная запись
+    # не оставит обрезанный CSV
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    compressed = path.suffix == '.gz'
+    if PYARROW_AVAILABLE:
+        # Форматирование чисел в C++ вместо построчного to_csv;
+        # DATE пишем как дату (YYYY-MM-DD), заголовок - без кавычек, как у pandas
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if 'DATE' in table.column_names:
+            date_idx = table.column_names.index('DATE')
+            table = table.set_column(date_idx, 'DATE', table.column('DATE').cast(pa.date32()))
+        with (gzip.open if compressed else open)(tmp_path, 'wb') as f:
+            f.write((','.join(table.column_names) + '\n').encode('utf-8'))
+            pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=False))
+    else:
+        df.to_csv(tmp_path, index=False, compression='gzip' if compressed else None)
+    os.replace(tmp_path, path)
+
+
+def migrate_to_parquet(data_dir: Path) -> int:
+    """
+    Создаёт Parquet-копии всех CSV файлов (однократная миграция).
+    
+    CSV остаются на месте: их пишет StockDataManager и читают остальные модули.
+    Копии пишет price_store (та же схема, что у анализа и аудита).
+    
+    Args:
+        data_dir: папка с CSV файлами
+        
+    Returns:
+        Количество созданных Parquet файлов
+    """
+    migrated = 0
+    for csv_path in sorted(data_dir.glob("*_full.csv")):
+        parquet_path = price_store.sidecar_path(csv_path)
+        # Копию старого формата (без OPEN/VOLUME) пересоздаём полностью
+        if (parquet_path.exists()
+                and parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns
+                and set(PRICE_COLUMNS) <= set(pq.read_schema(parquet_path).names)):
+            continue
+        price_store.load_prices(csv_path)
+        migrated += 1
+    return migrated
+
+
+def _parse_volume(value: str) -> float:
+    """Разбирает объем из CSV (пустое значение - NaN)."""
+    return float(value) if value else float('nan')
+
+
+def _fix_small_csv(csv_path: Path, out: List[str]) -> Optional[bool]:
+    """
+    Исправляет небольшой CSV модулем csv, без построения DataFrame.
+    
+    Логика та же, что у fix_csv_file: для каждой даты остаётся строка
+    с максимальным объемом, строки без объема удаляются, даты сортируются.
+    Значения сохраняются в исходном текстовом виде.
+    
+    Args:
+        csv_path: путь к CSV файлу
+        out: список, в который добавляются строки лога
+        
+    Returns:
+        True если успешно, None если файл пустой, в нём нет нужных колонок
+        или формат дат/чисел нестандартный и файл нужно разобрать через pandas
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None or not set(PRICE_COLUMNS) <= set(header):
+            return None
+        positions = [header.index(col) for col in PRICE_COLUMNS]
+        try:
+            rows = [[row[i] for i in positions] for row in reader if row]
+        except IndexError:
+            return None
+    
+    try:
+        days = [date.fromisoformat(row[0]) for row in rows]
+        volumes = [_parse_volume(row[5]) for row in rows]
+    except ValueError:
+        return None
+    
+    original_rows = len(rows)
+    out.append(f"\n{'='*60}")
+    out.append(f"📄 {csv_path.name}")
+    out.append(f"{'='*60}")
+    out.append(f"Исходно: {original_rows} строк")
+    
+    # Строки по датам (в порядке появления)
+    groups: Dict[date, List[int]] = {}
+    for i, day in enumerate(days):
+        groups.setdefault(day, []).append(i)
+    
+    # Шаг 1: Объединяем дублирующиеся даты - берем сессию с большим объемом (T+0)
+    if len(groups) < original_rows:
+        duplicate_dates = [day for day, idx in groups.items() if len(idx) > 1]
+        out.append(f"⚠️  Найдено дублирующихся дат (две сессии): {len(duplicate_dates)}")
+        for dup_date in duplicate_dates[:3]:  # Показываем первые 3
+            out.append(f"   {dup_date}: {len(groups[dup_date])} записей")
+            for i in groups[dup_date]:
+                vol = volumes[i]
+                vol_display = f"{int(vol):,}" if vol == vol else "N/A"
+                out.append(f"      O={_parse_volume(rows[i][1])} C={_parse_volume(rows[i][4])} V={vol_display}")
+        out.append(f"✅ Объединено: {original_rows - len(groups)} дополнительных сессий удалено")
+        out.append(f"   Оставлена основная сессия T+0 (большой объем)")
+    
+    # Пропуски объема считаем меньше любого значения; при равенстве - первая строка
+    kept = [max(idx, key=lambda i: volumes[i] if volumes[i] == volumes[i] else float('-inf'))
+            for idx in groups.values()]
+    
+    # Шаг 2: Удаляем строки с VOLUME=0
+    before_volume_filter = len(kept)
+    kept = [i for i in kept if volumes[i] > 0]
+    volume_removed = before_volume_filter - len(kept)
+    if volume_removed > 0:
+        out.append(f"🧹 Удалены дни без торговли: {volume_removed} строк")
+    
+    # Шаг 3: Проверяем целостность данных
+    changed = len(kept) != original_rows or any(a > b for a, b in zip(days, days[1:]))
+    kept.sort(key=days.__getitem__)
+    
+    if changed:
+        tmp_path = csv_path.with_suffix(csv_path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(PRICE_COLUMNS)
+            writer.writerows(rows[i] for i in kept)
+        os.replace(tmp_path, csv_path)
+    else:
+        out.append("✅ Исправления не требуются")
+    
+    out.append(f"📊 Итого: {len(kept)} строк")
+    if kept:
+        out.append(f"   Диапазон: {days[kept[0]]} → {days[kept[-1]]}")
+    
+    return True
+
+
 def fix_csv_file(csv_path: Path) -> bool:
-    """Исправляет CSV файл."""
+    """
+    Исправляет файл котировок (*.csv, *.csv.gz или *.parquet).
+    
+    Лог файла собирается в список и выводится одной записью в конце.
+    """
+    out: List[str] = []
     try:
+        # Небольшой CSV быстрее исправить модулем csv: накладные расходы
+        # pandas на таком объеме больше самой работы
+        if csv_path.suffix == '.csv' and csv_path.stat().st_size < SMALL_CSV_BYTES:
+            result = _fix_small_csv(csv_path, out)
+            if result is not None:
+                logger.info('\n'.join(out))
+                return result
+        
         # Читаем файл
-        df = pd.read_csv(csv_path, parse_dates=['DATE'])
+        df = _read_prices(csv_path)
         original_rows = len(df)
         
-        logger.info(f"\n{'='*60}")
-        logger.info(f"📄 {csv_path.name}")
-        logger.info(f"{'='*60}")
-        logger.info(f"Исходно: {original_rows} строк")
+        out.append(f"\n{'='*60}")
+        out.append(f"📄 {csv_path.name}")
+        out.append(f"{'='*60}")
+        out.append(f"Исходно: {original_rows} строк")
         
         # Шаг 1: Объединяем дублирующиеся даты (две сессии торговли)
         # Если есть несколько записей в один день - берем сессию с большим объемом (T+0)
         duplicates = df[df.duplicated(subset=['DATE'], keep=False)]
+        unique_dates = original_rows
         if len(duplicates) > 0:
             duplicate_dates = duplicates['DATE'].unique()
-            logger.info(f"⚠️  Найдено дублирующихся дат (две сессии): {len(duplicate_dates)}")
+            out.append(f"⚠️  Найдено дублирующихся дат (две сессии): {len(duplicate_dates)}")
             for dup_date in duplicate_dates[:3]:  # Показываем первые 3
-                dup_records = df[df['DATE'] == dup_date]
-                logger.info(f"   {dup_date.date()}: {len(dup_records)} записей")
-                for idx, row in dup_records.iterrows():
-                    vol_display = f"{int(row['VOLUME']):,}" if pd.notna(row['VOLUME']) else "N/A"
-                    logger.info(f"      O={row['OPEN']} C={row['CLOSE']} V={vol_display}")
+                dup_records = df.loc[df['DATE'] == dup_date, ['OPEN', 'CLOSE', 'VOLUME']]
+                out.append(f"   {dup_date.date()}: {len(dup_records)} записей")
+                for op, cl, vol in dup_records.itertuples(index=False, name=None):
+                    vol_display = f"{int(vol):,}" if pd.notna(vol) else "N/A"
+                    out.append(f"      O={op} C={cl} V={vol_display}")
             
-            # Сортируем по дате и объему (УБЫВАНИЕ)
-            # Берем первую запись каждой даты (с максимальным объемом) = T+0 основная сессия
-            df = df.sort_values(['DATE', 'VOLUME'], ascending=[True, False])
-            df = df.drop_duplicates(subset=['DATE'], keep='first')  # Берем T+0 (большой объем)
-            logger.info(f"✅ Объединено: {original_rows - len(df)} дополнительных сессий удалено")
-            logger.info(f"   Оставлена основная сессия T+0 (большой объем)")
+            unique_dates = df['DATE'].nunique()
+            out.append(f"✅ Объединено: {original_rows - unique_dates} дополнительных сессий удалено")
+            out.append(f"   Оставлена основная сессия T+0 (большой объем)")
         
-        before_volume_filter = len(df)
-        
-        # Шаг 2: Удаляем строки с VOLUME=0
+        # Шаг 2: Удаляем строки с VOLUME=0 - до выбора сессии, чтобы группировать
+        # меньший фрейм (такие строки не могут быть основной сессией)
         df = df[df['VOLUME'] > 0]
-        volume_removed = before_volume_filter - len(df)
+        
+        # Для каждой даты берем запись с максимальным объемом = T+0 основная сессия
+        # (один проход группировки вместо полной сортировки по DATE и VOLUME)
+        if len(duplicates) > 0:
+            keep_idx = df.groupby('DATE', sort=False)['VOLUME'].idxmax()
+            df = df.loc[keep_idx]  # Берем T+0 (большой объем)
+        
+        volume_removed = unique_dates - len(df)
         if volume_removed > 0:
-            logger.info(f"🧹 Удалены дни без торговли: {volume_removed} строк")
+            out.append(f"🧹 Удалены дни без торговли: {volume_removed} строк")
         
-        # Шаг 3: Проверяем целостность данных
-        df = df.sort_values('DATE').reset_index(drop=True)
+        # Шаг 3: Проверяем целостность данных (сортируем, только если будем сохранять)
+        changed = len(df) != original_rows or not df['DATE'].is_monotonic_increasing
         
-        # Сохраняем
-        df.to_csv(csv_path, index=False)
+        # Сохраняем (файл без дублей, нулевых объемов и беспорядка не переписываем)
+        if changed:
+            df = df.sort_values('DATE').reset_index(drop=True)
+            _write_prices(df, csv_path)
+        else:
+            out.append("✅ Исправления не требуются")
         
-        logger.info(f"📊 Итого: {len(df)} строк")
-        logger.info(f"   Диапазон: {df['DATE'].min().date()} → {df['DATE'].max().date()}")
+        out.append(f"📊 Итого: {len(df)} строк")
+        out.append(f"   Диапазон: {df['DATE'].min().date()} → {df['DATE'].max().date()}")
         
+        logger.info('\n'.join(out))
         return True
     
     except Exception as e:
+        if out:
+            logger.info('\n'.join(out))
         logger.error(f"❌ Ошибка: {e}")
         return False
 
-# Обрабатываем все CSV файлы
-data_dir = Path("stock_data")
-csv_files = sorted(data_dir.glob("*.csv"))
 
-logger.info(f"\n🔧 ИСПРАВЛЕНИЕ CSV ФАЙЛОВ\n")
-logger.info(f"Найдено файлов: {len(csv_files)}\n")
+def fix_csv_file_polars(csv_path: Path) -> bool:
+    """
+    Исправляет файл котировок потоково через lazy API polars.
+    
+    Данные не материализуются целиком, поэтому промежуточные подсчёты
+    (дубли, удалённые строки) не выводятся.
+    
+    Args:
+        csv_path: путь к *.csv или *.parquet файлу
+                  (*.csv.gz polars не читает потоково - их исправляет fix_csv_file)
+        
+    Returns:
+        True если успешно, False в противном случае
+    """
+    if csv_path.suffix == '.gz':
+        return fix_csv_file(csv_path)
+    
+    out: List[str] = []
+    try:
+        out.append(f"\n{'='*60}")
+        out.append(f"📄 {csv_path.name}")
+        out.append(f"{'='*60}")
+        
+        if csv_path.suffix == '.parquet':
+            lf = pl.scan_parquet(csv_path).select(PRICE_COLUMNS)
+        else:
+            lf = pl.scan_csv(csv_path, try_parse_dates=True).select(PRICE_COLUMNS)
+        
+        # Строки с VOLUME=0 не могут быть основной сессией - убираем их до
+        # дедупликации, затем для каждой даты оставляем максимальный объем
+        lf = (
+            lf.filter(pl.col('VOLUME') > 0)
+            .sort(['DATE', 'VOLUME'], descending=[False, True], maintain_order=True)
+            .unique(subset=['DATE'], keep='first', maintain_order=True)
+        )
+        
+        # Результат пишется во временный файл: источник читается потоково
+        tmp_path = csv_path.with_suffix(csv_path.suffix + '.tmp')
+        if csv_path.suffix == '.parquet':
+            lf.sink_parquet(tmp_path, compression='snappy')
+        else:
+            lf.sink_csv(tmp_path)
+        os.replace(tmp_path, csv_path)
+        
+        out.append("✅ Файл очищен (polars)")
+        logger.info('\n'.join(out))
+        return True
+    
+    except Exception as e:
+        logger.info('\n'.join(out))
+        logger.error(f"❌ Ошибка: {e}")
+        return False
 
-success = 0
-failed = 0
 
-for csv_file in csv_files:
-    if fix_csv_file(csv_file):
-        success += 1
-    else:
-        failed += 1
+def _fix_file_task(csv_path: Path, use_polars: bool = False) -> Tuple[bool, str]:
+    """
+    Исправляет файл в процессе-воркере, собирая его лог в строку.
+    
+    Лог возвращается целиком и выводится главным процессом,
+    чтобы строки разных файлов не перемешивались.
+    
+    Args:
+        csv_path: путь к файлу котировок
+        use_polars: очищать через polars (fix_csv_file_polars)
+        
+    Returns:
+        (успех, текст лога файла)
+    """
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        ok = fix_csv_file_polars(csv_path) if use_polars else fix_csv_file(csv_path)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+    return ok, buffer.getvalue().rstrip('\n')
 
-logger.info(f"\n{'='*60}")
-logger.info(f"✅ Успешно: {success}/{len(csv_files)}")
-logger.info(f"❌ Ошибок: {failed}")
-logger.info(f"{'='*60}\n")
 
-# ВАЖНО: Информация о влиянии на алгоритмы
-logger.info("""
+# Пояснение о влиянии очистки на алгоритмы анализа
+ALGORITHMS_NOTE = """
 📊 ВЛИЯНИЕ НА АЛГОРИТМЫ АНАЛИЗА:
 
 1️⃣  EMA (Экспоненциальная Скользящая Средняя):
@@ -113,5 +432,70 @@ logger.info("""
    ✅ Анализ становится корректнее
 
 ВЫВОД: ✅ Удаление VOLUME=0 и объединение дублей = улучшение качества данных!
-""")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Исправление проблем в файлах котировок')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Создать Parquet-копии CSV и исправлять их вместо CSV')
+    parser.add_argument('--polars', action='store_true',
+                        help='Очищать потоково через polars (без подробного лога)')
+    parser.add_argument('--force', action='store_true',
+                        help='Проверить все файлы, даже не изменившиеся с прошлой очистки')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Количество параллельных процессов (по умолчанию - число ядер)')
+    args = parser.parse_args()
+    
+    data_dir = Path("stock_data")
+    if args.parquet and not PYARROW_AVAILABLE:
+        parser.error("для --parquet нужен pyarrow: pip install pyarrow")
+    if args.polars and not POLARS_AVAILABLE:
+        parser.error("для --polars нужен polars: pip install polars")
+    if args.parquet:
+        migrated = migrate_to_parquet(data_dir)
+        logger.info(f"\n📦 Создано Parquet файлов: {migrated}")
+        csv_files = sorted(data_dir.glob("*_full.parquet"))
+    else:
+        csv_files = sorted([*data_dir.glob("*.csv"), *data_dir.glob("*.csv.gz")])
+    
+    logger.info(f"\n🔧 ИСПРАВЛЕНИЕ CSV ФАЙЛОВ\n")
+    logger.info(f"Найдено файлов: {len(csv_files)}\n")
+    
+    # Файлы, не изменившиеся после прошлой очистки, не читаем повторно
+    registry = {} if args.force else _load_registry(data_dir)
+    pending = [f for f in csv_files if registry.get(f.name) != f.stat().st_mtime_ns]
+    skipped = len(csv_files) - len(pending)
+    if skipped:
+        logger.info(f"⏭️  Без изменений с прошлой очистки: {skipped}\n")
+    
+    success = skipped
+    failed = 0
+    
+    # Файлы независимы - обрабатываем их параллельно в отдельных процессах
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {executor.submit(_fix_file_task, csv_file, args.polars): csv_file for csv_file in pending}
+        for future in as_completed(futures):
+            ok, log_text = future.result()
+            logger.info(log_text)
+            if ok:
+                success += 1
+                csv_file = futures[future]
+                registry[csv_file.name] = csv_file.stat().st_mtime_ns
+            else:
+                failed += 1
+    
+    if pending:
+        _save_registry(data_dir, registry)
+    
+    logger.info(f"\n{'='*60}")
+    logger.info(f"✅ Успешно: {success}/{len(csv_files)}")
+    logger.info(f"❌ Ошибок: {failed}")
+    logger.info(f"{'='*60}\n")
+    
+    # ВАЖНО: Информация о влиянии на алгоритмы
+    logger.info(ALGORITHMS_NOTE)
+
 
+if __name__ == "__main__":
+    main()
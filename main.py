@@ -13,19 +13,29 @@ Stock Analyzer - CLI интерфейс для управления и анал
 """
 
 import argparse
+import copy
+import itertools
+import mmap
+import os
+import re
 import sys
 import json
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from contextlib import contextmanager
+from functools import cached_property
+from typing import List, Dict, Iterator, Optional
 
-from stock_data_manager import StockDataManager
-from technical_analysis import TechnicalAnalyzer
-from report_generator import ReportGenerator
-from audit_manager import AuditManager
-from audit_report_generator import AuditReportGenerator
-from news_integration import NewsIntegration
+# Модули анализа (pandas, ta, requests) импортируются лениво - в командах,
+# которым они нужны: list/status/remove запускаются без них
+
+# orjson (опционально) - быстрый разбор и запись config.json и новостей
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Настройка логирования
 logging.basicConfig(
@@ -38,22 +48,57 @@ logger = logging.getLogger(__name__)
 CONFIG_FILE = Path("config.json")
 DEFAULT_WATCHLIST = ['SBER', 'GAZP', 'LKOH', 'NVTK', 'TATN']
 
+# Поиск BUY сигналов в markdown отчёте (только в пределах строки).
+# Шаблоны байтовые: отчёт сканируется через mmap без декодирования UTF-8
+_BUY_TABLE_RE = re.compile(rb'\*\*([A-Z0-9\-]+)\*\*[^\n]*?' + re.escape('🟢 BUY'.encode('utf-8')))
+_BUY_LIST_RE = re.compile(rb'- \*\*([A-Z0-9\-]+)\*\*')
+_BUY_SECTION = '### 🟢 Сигналы на ПОКУПКУ'.encode('utf-8')
+_HOLD_SECTION = '### 🟡 HOLD'.encode('utf-8')
+
 
 class ConfigManager:
     """Менеджер конфигурации приложения."""
 
-    @staticmethod
-    def load_config() -> Dict:
-        """Загружает конфигурацию из файла."""
-        if CONFIG_FILE.exists():
-            try:
+    # Кэш config.json: файл перечитывается, только если изменился его mtime
+    _cache: Optional[Dict] = None
+    _cache_mtime_ns: Optional[int] = None
+
+    @classmethod
+    def load_config(cls) -> Dict:
+        """
+        Загружает конфигурацию из файла.
+        
+        Разобранный config.json кэшируется, пока не изменится mtime файла.
+        Возвращается общий объект кэша - изменять его можно только через
+        копию (см. мутирующие методы).
+        """
+        try:
+            mtime_ns = CONFIG_FILE.stat().st_mtime_ns
+        except FileNotFoundError:
+            return cls.create_default_config()
+        
+        if cls._cache is not None and mtime_ns == cls._cache_mtime_ns:
+            return cls._cache
+        
+        try:
+            if ORJSON_AVAILABLE:
+                config = orjson.loads(CONFIG_FILE.read_bytes())
+            else:
                 with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Ошибка при загрузке config.json: {e}")
-                return ConfigManager.create_default_config()
-        else:
-            return ConfigManager.create_default_config()
+                    config = json.load(f)
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке config.json: {e}")
+            return cls.create_default_config()
+        
+        cls._cache = config
+        cls._cache_mtime_ns = mtime_ns
+        return config
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Сбрасывает кэш конфигурации (следующий load_config прочитает файл)."""
+        cls._cache = None
+        cls._cache_mtime_ns = None
 
     @staticmethod
     def create_default_config() -> Dict:
@@ -72,14 +117,21 @@ class ConfigManager:
         logger.info("✅ Создана конфигурация по умолчанию")
         return config
 
-    @staticmethod
-    def save_config(config: Dict) -> bool:
-        """Сохраняет конфигурацию в файл."""
+    @classmethod
+    def save_config(cls, config: Dict) -> bool:
+        """Сохраняет конфигурацию в файл (и в кэш)."""
         try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            if ORJSON_AVAILABLE:
+                CONFIG_FILE.write_bytes(orjson.dumps(
+                    config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=2, ensure_ascii=False)
+            cls._cache = config
+            cls._cache_mtime_ns = CONFIG_FILE.stat().st_mtime_ns
             return True
         except Exception as e:
+            cls.invalidate_cache()
             logger.error(f"Ошибка при сохранении config.json: {e}")
             return False
 
@@ -89,44 +141,89 @@ class ConfigManager:
         config = ConfigManager.load_config()
         return config.get('watchlist', DEFAULT_WATCHLIST)
 
+    @staticmethod
+    @contextmanager
+    def transaction() -> Iterator[Dict]:
+        """
+        Групповое изменение конфигурации с одной записью на диск.
+        
+        Отдаёт копию конфигурации для изменения на месте и сохраняет её при
+        выходе из блока (только если она изменилась). Если в блоке возникло
+        исключение, изменения отбрасываются.
+        
+        Raises:
+            OSError: если сохранить config.json не удалось
+        """
+        original = ConfigManager.load_config()
+        config = copy.deepcopy(original)
+        yield config
+        if config != original and not ConfigManager.save_config(config):
+            raise OSError(f"Не удалось сохранить {CONFIG_FILE}")
+
     @staticmethod
     def add_to_watchlist(ticker: str) -> bool:
         """Добавляет акцию в watchlist."""
-        config = ConfigManager.load_config()
         ticker = ticker.upper()
 
-        if ticker in config['watchlist']:
+        if ticker in ConfigManager.get_watchlist():
             logger.warning(f"⚠️ {ticker} уже в watchlist")
             return False
 
-        config['watchlist'].append(ticker)
-        if ConfigManager.save_config(config):
-            logger.info(f"✅ {ticker} добавлен в watchlist")
-            return True
-        return False
+        try:
+            with ConfigManager.transaction() as config:
+                config['watchlist'].append(ticker)
+        except OSError:
+            return False
+        logger.info(f"✅ {ticker} добавлен в watchlist")
+        return True
 
     @staticmethod
     def remove_from_watchlist(ticker: str) -> bool:
         """Удаляет акцию из watchlist."""
-        config = ConfigManager.load_config()
         ticker = ticker.upper()
 
-        if ticker not in config['watchlist']:
+        if ticker not in ConfigManager.get_watchlist():
             logger.warning(f"⚠️ {ticker} не в watchlist")
             return False
 
-        config['watchlist'].remove(ticker)
-        if ConfigManager.save_config(config):
-            logger.info(f"✅ {ticker} удален из watchlist")
-            return True
-        return False
+        try:
+            with ConfigManager.transaction() as config:
+                config['watchlist'].remove(ticker)
+        except OSError:
+            return False
+        logger.info(f"✅ {ticker} удален из watchlist")
+        return True
 
     @staticmethod
     def update_timestamp(key: str) -> None:
         """Обновляет timestamp события."""
-        config = ConfigManager.load_config()
-        config[key] = datetime.now().isoformat()
-        ConfigManager.save_config(config)
+        try:
+            with ConfigManager.transaction() as config:
+                config[key] = datetime.now().isoformat()
+        except OSError:
+            pass  # ошибка уже записана в лог save_config
+
+    @staticmethod
+    def update_timestamps(last_updated: bool = False, last_report: bool = False) -> None:
+        """
+        Обновляет timestamp'ы событий одной записью config.json.
+        
+        Args:
+            last_updated: обновить время последнего обновления данных
+            last_report: обновить время последнего отчёта
+        """
+        keys = [key for key, flag in (('last_updated', last_updated),
+                                      ('last_report', last_report)) if flag]
+        if not keys:
+            return
+        
+        now = datetime.now().isoformat()
+        try:
+            with ConfigManager.transaction() as config:
+                for key in keys:
+                    config[key] = now
+        except OSError:
+            pass  # ошибка уже записана в лог save_config
 
 
 class StockAnalyzerCLI:
@@ -134,10 +231,30 @@ class StockAnalyzerCLI:
 
     def __init__(self):
         """Инициализация."""
-        self.manager = StockDataManager()
-        self.analyzer = TechnicalAnalyzer()
-        self.reporter = ReportGenerator()
-        self.audit = AuditManager()
+
+    @cached_property
+    def manager(self):
+        """Менеджер данных (создаётся при первом обращении)."""
+        from stock_data_manager import StockDataManager
+        return StockDataManager()
+
+    @cached_property
+    def analyzer(self):
+        """Технический анализатор (создаётся при первом обращении)."""
+        from technical_analysis import TechnicalAnalyzer
+        return TechnicalAnalyzer()
+
+    @cached_property
+    def reporter(self):
+        """Генератор отчётов (создаётся при первом обращении)."""
+        from report_generator import ReportGenerator
+        return ReportGenerator()
+
+    @cached_property
+    def audit(self):
+        """Менеджер аудита (создаётся при первом обращении)."""
+        from audit_manager import AuditManager
+        return AuditManager()
 
     def update_data(self, args) -> int:
         """Команда: обновить данные."""
@@ -153,7 +270,7 @@ class StockAnalyzerCLI:
 
         print(f"📊 Обновляем {len(watchlist)} акций: {', '.join(watchlist)}\n")
 
-        results = self.manager.update_watchlist(watchlist)
+        results = self.manager.update_watchlist(watchlist, max_workers=args.jobs)
 
         # Статистика
         successful = sum(1 for v in results.values() if v)
@@ -163,7 +280,7 @@ class StockAnalyzerCLI:
         print(f"❌ Ошибок: {failed}")
 
         if failed == 0:
-            ConfigManager.update_timestamp('last_updated')
+            ConfigManager.update_timestamps(last_updated=True)
             print("\n✅ Все данные обновлены!")
             return 0
         else:
@@ -189,53 +306,59 @@ class StockAnalyzerCLI:
 
         if filepath:
             print(f"\n✅ Отчёт создан: {filepath}")
-            ConfigManager.update_timestamp('last_report')
+            ConfigManager.update_timestamps(last_report=True)
 
             # 📰 Попытка загрузить новости (используется Mock провайдер)
             print("\n📰 Инициализирую систему новостей...")
             try:
-                news_integration = NewsIntegration()
-                print(f"   {news_integration.get_provider_info()}")
+                from news_integration import NewsIntegration
+                with NewsIntegration() as news_integration:
+                    print(f"   {news_integration.get_provider_info()}")
                 
-                # Парсим отчёт чтобы найти BUY сигналы
-                buy_signals = self._extract_buy_signals(filepath)
+                    # Парсим отчёт чтобы найти BUY сигналы
+                    buy_signals = self._extract_buy_signals(filepath)
                 
-                if buy_signals:
-                    print(f"   Найдено {len(buy_signals)} BUY сигналов: {', '.join(buy_signals)}")
-                    news_results = news_integration.get_news_for_analysis(buy_signals)
+                    if buy_signals:
+                        print(f"   Найдено {len(buy_signals)} BUY сигналов: {', '.join(buy_signals)}")
+                        news_results = news_integration.get_news_for_analysis(buy_signals)
                     
-                    if news_results:
-                        # Сохраняем новости в JSON
-                        news_file = Path("stock_news.json")
-                        with open(news_file, 'w', encoding='utf-8') as f:
-                            json.dump(news_results, f, ensure_ascii=False, indent=2)
+                        if news_results:
+                            # Сохраняем новости в JSON
+                            news_file = Path("stock_news.json")
+                            if ORJSON_AVAILABLE:
+                                news_file.write_bytes(orjson.dumps(
+                                    news_results, option=orjson.OPT_INDENT_2))
+                            else:
+                                with open(news_file, 'w', encoding='utf-8') as f:
+                                    json.dump(news_results, f, ensure_ascii=False, indent=2)
                         
-                        print(f"✅ Новости сохранены: {news_file}")
+                            print(f"✅ Новости сохранены: {news_file}")
                         
-                        # Выводим статистику
-                        total_articles = sum(len(v) for v in news_results.values())
-                        print(f"   📊 Всего статей найдено: {total_articles}")
-                        for ticker, articles in news_results.items():
-                            sentiments = [a.get('sentiment') for a in articles]
-                            print(f"   - {ticker}: {len(articles)} статей ({', '.join(set(sentiments))})")
+                            # Выводим статистику
+                            total_articles = sum(len(v) for v in news_results.values())
+                            print(f"   📊 Всего статей найдено: {total_articles}")
+                            for ticker, articles in news_results.items():
+                                sentiments = [a.get('sentiment') for a in articles]
+                                print(f"   - {ticker}: {len(articles)} статей ({', '.join(set(sentiments))})")
+                        else:
+                            print("   ℹ️ Новостей не получено (используется Mock провайдер)")
+                            print("   ⚠️ Когда появится MOEX API - новости будут автоматически добавлены")
                     else:
-                        print("   ℹ️ Новостей не получено (используется Mock провайдер)")
-                        print("   ⚠️ Когда появится MOEX API - новости будут автоматически добавлены")
-                else:
-                    print("   ℹ️ BUY сигналов не найдено")
+                        print("   ℹ️ BUY сигналов не найдено")
                     
             except Exception as e:
                 logger.warning(f"⚠️ Ошибка при работе с новостями: {e}")
 
-            # Выводим первую часть отчёта
+            # Выводим первую часть отчёта (читаем только первые 40 строк)
             with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-                print(f"\n📄 Первая часть отчёта:")
-                print("─" * 60)
-                print('\n'.join(lines[:40]))
-                print("─" * 60)
-                print(f"...\n(Смотрите полный отчёт в {filepath})")
+                preview = ''.join(itertools.islice(f, 40))
+            if preview.endswith('\n'):
+                preview = preview[:-1]
+            print(f"\n📄 Первая часть отчёта:")
+            print("─" * 60)
+            print(preview)
+            print("─" * 60)
+            print(f"...\n(Смотрите полный отчёт в {filepath})")
 
             return 0
         else:
@@ -252,31 +375,32 @@ class StockAnalyzerCLI:
         Returns:
             Список тикеров с BUY сигналами
         """
-        buy_tickers = []
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Ищем строки с BUY сигналами в таблице
-            import re
-            # Паттерн: | # | **TICKER** | ... | 🟢 BUY |
-            matches = re.findall(r'\*\*([A-Z0-9\-]+)\*\*.*?🟢 BUY', content)
-            buy_tickers.extend(matches)
+            if filepath.stat().st_size == 0:
+                return []
             
-            # Ищем в списке "Сигналы на ПОКУПКУ"
-            # Паттерн: - **TICKER** (...)
-            if '### 🟢 Сигналы на ПОКУПКУ' in content:
-                signals_section = content.split('### 🟢 Сигналы на ПОКУПКУ')[1]
-                if '### 🟡 HOLD' in signals_section:
-                    signals_section = signals_section.split('### 🟡 HOLD')[0]
+            # Файл отображается в память: regex работает по байтам без копии
+            # и без декодирования, декодируются только найденные тикеры
+            with open(filepath, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Таблица рейтинга идёт до секции сигналов
+                section_start = mm.find(_BUY_SECTION)
+                head_end = section_start if section_start != -1 else len(mm)
                 
-                matches = re.findall(r'- \*\*([A-Z0-9\-]+)\*\*', signals_section)
-                buy_tickers.extend(matches)
-            
-            # Убираем дубликаты и исключённые (с ⚠️)
-            buy_tickers = list(set(buy_tickers))
+                # Ищем строки с BUY сигналами в таблице
+                # Паттерн: | # | **TICKER** | ... | 🟢 BUY |
+                buy_tickers = _BUY_TABLE_RE.findall(mm, 0, head_end)
+                
+                # Ищем в списке "Сигналы на ПОКУПКУ"
+                # Паттерн: - **TICKER** (...)
+                if section_start != -1:
+                    section_end = mm.find(_HOLD_SECTION, section_start)
+                    if section_end == -1:
+                        section_end = len(mm)
+                    buy_tickers.extend(_BUY_LIST_RE.findall(mm, section_start, section_end))
             
-            return buy_tickers
+            # Убираем дубликаты, сохраняя порядок появления в отчёте
+            return [ticker.decode('ascii') for ticker in dict.fromkeys(buy_tickers)]
             
         except Exception as e:
             logger.warning(f"Ошибка при парсинге отчёта: {e}")
@@ -418,7 +542,10 @@ class StockAnalyzerCLI:
         print("\nДоступные данные:")
         data_dir = Path("stock_data")
         if data_dir.exists():
-            csv_files = list(data_dir.glob("*.csv"))
+            # Один проход scandir: DirEntry кэширует stat() для размеров
+            with os.scandir(data_dir) as it:
+                csv_files = sorted((e for e in it if e.name.endswith(('.csv', '.csv.gz'))),
+                                   key=lambda e: e.name)
             print(f"  CSV файлов: {len(csv_files)}")
             if csv_files:
                 for csv_file in csv_files[:5]:
@@ -432,7 +559,8 @@ class StockAnalyzerCLI:
         print("\nОтчёты:")
         reports_dir = Path("reports")
         if reports_dir.exists():
-            report_files = list(reports_dir.glob("*.md"))
+            with os.scandir(reports_dir) as it:
+                report_files = [e for e in it if e.name.endswith('.md')]
             print(f"  Markdown отчётов: {len(report_files)}")
             if report_files:
                 # Последний отчёт
@@ -483,6 +611,7 @@ class StockAnalyzerCLI:
 
             # Генерируем HTML отчёт
             print(f"\n📄 Создаём HTML отчёт...")
+            from audit_report_generator import AuditReportGenerator
             generator = AuditReportGenerator()
             report_path = generator.save_report()
             print(f"✅ Отчёт сохранён: {report_path}")
@@ -518,10 +647,16 @@ def main():
     subparsers = parser.add_subparsers(dest='command', help='Доступные команды')
 
     # Команда: update
-    subparsers.add_parser(
+    update_parser = subparsers.add_parser(
         'update',
         help='Обновить данные всех акций из watchlist'
     )
+    update_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=8,
+        help='Количество параллельных загрузок (по умолчанию 8)'
+    )
 
     # Команда: analyze
     subparsers.add_parser(
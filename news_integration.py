@@ -10,22 +10,125 @@
 Это позволяет легко переключаться между провайдерами и добавлять новые.
 """
 
+import atexit
 import json
 import logging
+import random
+import re
+import sqlite3
+import threading
+import weakref
+from collections import Counter
+from functools import lru_cache
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson (опционально) - быстрая (де)сериализация кэша новостей
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson (опционально) - потоковый разбор ответа Finnhub до max_results статей
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Незакрытые NewsIntegration: при выходе сбрасываем их кэш на диск.
+# WeakSet не продлевает жизнь объектов (в отличие от atexit с bound-методом)
+_open_integrations = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_integrations():
+    """Закрывает NewsIntegration, которые не закрыли явно."""
+    for integration in list(_open_integrations):
+        integration.close()
+
+
+def _dump_news(news: List[Dict]) -> str:
+    """Сериализует новости для кэша в компактный JSON (без отступов и пробелов)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(news).decode('utf-8')
+    return json.dumps(news, ensure_ascii=False, separators=(',', ':'))
+
+
+def _load_news(data: str) -> List[Dict]:
+    """Разбирает новости из кэша."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Словари для оценки sentiment (подстроки: 'рост' совпадает и с 'прирост')
+POSITIVE_WORDS = frozenset({'рост', 'прибыль', 'доход', 'успех', 'хороший', 'отличный',
+                            'увеличение', 'подъём', 'восстановление', 'улучшение'})
+NEGATIVE_WORDS = frozenset({'падение', 'убыток', 'потеря', 'снижение', 'плохой',
+                            'кризис', 'санкции', 'штраф', 'критика', 'проблема'})
+
+
+def _keyword_matcher(words) -> re.Pattern:
+    """
+    Строит регулярное выражение, находящее все слова словаря за один проход.
+    
+    Lookahead-группа даёт совпадения с каждой позиции текста (в том числе
+    перекрывающиеся), поэтому результат совпадает с проверкой
+    `word in text` для каждого слова (пока ни одно слово словаря
+    не является началом другого).
+    """
+    # Словарь приводим к нижнему регистру один раз (текст сравнивается
+    # в нижнем регистре); сортируем, т.к. порядок обхода frozenset
+    # меняется от запуска к запуску
+    lowered = sorted({word.lower() for word in words})
+    alternation = '|'.join(re.escape(word) for word in lowered)
+    return re.compile(f'(?=({alternation}))')
+
+
+_POSITIVE_RE = _keyword_matcher(POSITIVE_WORDS)
+_NEGATIVE_RE = _keyword_matcher(NEGATIVE_WORDS)
+
+
+@lru_cache(maxsize=4096)
+def _analyze_sentiment(text: str) -> str:
+    """
+    Анализирует sentiment текста.
+    
+    Одинаковые заголовки часто приходят по нескольким тикерам и в
+    нескольких запросах подряд, поэтому результат кэшируется.
+    """
+    text_lower = text.lower()
+    
+    # Считаем различные слова словаря, встретившиеся в тексте
+    positive_count = len(set(_POSITIVE_RE.findall(text_lower)))
+    negative_count = len(set(_NEGATIVE_RE.findall(text_lower)))
+    
+    if positive_count > negative_count:
+        return 'POSITIVE'
+    elif negative_count > positive_count:
+        return 'NEGATIVE'
+    else:
+        return 'NEUTRAL'
+
 
 class NewsProvider(ABC):
     """Базовый интерфейс для провайдеров новостей."""
     
+    # Параллельные запросы в search_news_batch по умолчанию
+    BATCH_WORKERS = 8
+    
     @abstractmethod
-    def search_news(self, ticker: str, max_results: int = 5) -> List[Dict]:
+    def search_news(self, ticker: str, max_results: int = 5) -> Optional[List[Dict]]:
         """
         Ищет новости по тикеру.
         
@@ -34,10 +137,47 @@ class NewsProvider(ABC):
             max_results: Максимум результатов
             
         Returns:
-            Список новостей с полями: title, description, date, source, url, sentiment
+            Список новостей с полями: title, description, date, source, url, sentiment;
+            None, если запрос не удался (такой результат не кэшируется)
         """
         pass
     
+    def search_news_batch(self, tickers: List[str], max_results: int = 5) -> Dict[str, List[Dict]]:
+        """
+        Ищет новости сразу по нескольким тикерам.
+        
+        По умолчанию вызывает search_news по каждому тикеру параллельно.
+        Провайдеры, чей API принимает несколько тикеров в одном запросе
+        (symbols=a,b,c), переопределяют метод и делают один запрос.
+        
+        Args:
+            tickers: Список тикеров
+            max_results: Максимум результатов на тикер
+            
+        Returns:
+            Словарь {ticker: [news]}; тикеры, запрос по которым упал, отсутствуют
+        """
+        if not tickers:
+            return {}
+        
+        news_by_ticker = {}
+        with ThreadPoolExecutor(max_workers=min(self.BATCH_WORKERS, len(tickers))) as executor:
+            futures = {
+                executor.submit(self.search_news, ticker, max_results): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    news = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Ошибка получения новостей {ticker}: {e}")
+                    continue
+                if news is not None:
+                    news_by_ticker[ticker] = news
+        
+        return news_by_ticker
+    
     @abstractmethod
     def get_name(self) -> str:
         """Возвращает имя провайдера."""
@@ -92,6 +232,9 @@ class FinnhubNewsProvider(NewsProvider):
     """
     
     FINNHUB_URL = "https://finnhub.io/api/v1/company-news"
+    POOL_SIZE = 16
+    # Временные ошибки: повторяем с экспоненциальной задержкой
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
     
     def __init__(self, api_key: str = "demo"):
         """
@@ -100,13 +243,25 @@ class FinnhubNewsProvider(NewsProvider):
         """
         self.api_key = api_key
         
+        # Одна сессия на провайдер: keep-alive соединения к finnhub.io
+        # переиспользуются между тикерами (без повторного TCP+TLS handshake)
+        retry = Retry(total=3, backoff_factor=1.0,
+                      status_forcelist=self.RETRY_STATUSES,
+                      allowed_methods=["GET"],
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE,
+                              pool_maxsize=self.POOL_SIZE,
+                              max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        
         if api_key == "demo":
             logger.warning(
                 "⚠️ FinnhubNewsProvider использует demo key! "
                 "Зарегистрируйся на https://finnhub.io для реального API key."
             )
     
-    def search_news(self, ticker: str, max_results: int = 5) -> List[Dict]:
+    def search_news(self, ticker: str, max_results: int = 5) -> Optional[List[Dict]]:
         """
         Ищет новости по тикеру через Finnhub API.
         
@@ -117,7 +272,7 @@ class FinnhubNewsProvider(NewsProvider):
             max_results: Максимум результатов
             
         Returns:
-            Список новостей или пустой список при ошибке
+            Список новостей (пустой, если новостей нет) или None при ошибке
         """
         logger.info(f"🔍 Ищу новости по {ticker} через Finnhub...")
         
@@ -127,19 +282,20 @@ class FinnhubNewsProvider(NewsProvider):
                 'token': self.api_key
             }
             
-            response = requests.get(self.FINNHUB_URL, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if isinstance(data, dict) and 'error' in data:
-                logger.warning(f"⚠️ Finnhub ошибка: {data.get('error')}")
-                return []
+            with self._session.get(self.FINNHUB_URL, params=params,
+                                   timeout=10, stream=True) as response:
+                retries = getattr(response.raw, 'retries', None)
+                if retries is not None and retries.history:
+                    logger.debug(f"Finnhub {ticker}: ответ получен с попытки {len(retries.history) + 1}")
+                response.raise_for_status()
+                
+                articles = self._read_articles(response, max_results)
             
-            articles = data if isinstance(data, list) else []
+            if articles is None:
+                return None
             
             news_list = []
-            for article in articles[:max_results]:
+            for article in articles:
                 timestamp = article.get('datetime', 0)
                 if timestamp:
                     article_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
@@ -152,7 +308,7 @@ class FinnhubNewsProvider(NewsProvider):
                     'date': article_date,
                     'source': article.get('source', 'Unknown'),
                     'url': article.get('url', ''),
-                    'sentiment': self._analyze_sentiment(
+                    'sentiment': _analyze_sentiment(
                         article.get('headline', '') + ' ' + article.get('summary', '')
                     )
                 }
@@ -161,34 +317,79 @@ class FinnhubNewsProvider(NewsProvider):
             logger.info(f"✅ Найдено {len(news_list)} новостей по {ticker}")
             return news_list
             
-        except requests.exceptions.Timeout:
-            logger.error(f"❌ Timeout при поиске новостей {ticker}")
-            return []
+        except (requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.RetryError) as e:
+            # Временная ошибка: повторы адаптера исчерпаны
+            logger.warning(f"⚠️ Finnhub недоступен для {ticker} после повторов: {e}")
+            return None
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status in self.RETRY_STATUSES:
+                logger.warning(f"⚠️ Временная ошибка Finnhub {status} для {ticker}")
+            else:
+                # 4xx (неверный токен, тикер и т.п.) — повтор не поможет
+                logger.error(f"❌ Ошибка запроса Finnhub {status} для {ticker}: {e}")
+            return None
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Ошибка сети: {e}")
-            return []
+            return None
         except Exception as e:
             logger.error(f"❌ Ошибка: {e}")
-            return []
+            return None
     
-    def _analyze_sentiment(self, text: str) -> str:
-        """Анализирует sentiment текста."""
-        text_lower = text.lower()
+    def _read_articles(self, response: requests.Response, max_results: int) -> Optional[List[Dict]]:
+        """
+        Читает первые max_results статей из ответа Finnhub.
         
-        positive_words = ['рост', 'прибыль', 'доход', 'успех', 'хороший', 'отличный', 
-                         'увеличение', 'подъём', 'восстановление', 'улучшение']
-        negative_words = ['падение', 'убыток', 'потеря', 'снижение', 'плохой', 
-                         'кризис', 'санкции', 'штраф', 'критика', 'проблема']
+        С ijson массив разбирается потоково, по мере прихода данных: как только
+        набрано max_results статей, разбор прекращается, а остаток тела
+        просто вычитывается, чтобы соединение вернулось в пул.
         
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        Args:
+            response: Ответ, полученный с stream=True
+            max_results: Максимум статей
+            
+        Returns:
+            Список статей или None, если Finnhub вернул ошибку (или не массив)
+        """
+        if not IJSON_AVAILABLE:
+            data = response.json()
+            if isinstance(data, dict) and 'error' in data:
+                logger.warning(f"⚠️ Finnhub ошибка: {data.get('error')}")
+                return None
+            return data[:max_results] if isinstance(data, list) else None
         
-        if positive_count > negative_count:
-            return 'POSITIVE'
-        elif negative_count > positive_count:
-            return 'NEGATIVE'
-        else:
-            return 'NEUTRAL'
+        chunks = response.iter_content(chunk_size=16 * 1024)
+        articles = []
+        parsed = ijson.sendable_list()
+        parser = ijson.items_coro(parsed, 'item', use_float=True)
+        is_array = None
+        
+        for chunk in chunks:
+            if is_array is None:
+                head = chunk.lstrip()
+                if not head:
+                    continue
+                # Ошибка приходит объектом {"error": ...}, статьи - массивом
+                is_array = head.startswith(b'[')
+                if not is_array:
+                    data = json.loads(chunk + b''.join(chunks))
+                    if isinstance(data, dict) and 'error' in data:
+                        logger.warning(f"⚠️ Finnhub ошибка: {data.get('error')}")
+                    return None
+            
+            parser.send(chunk)
+            articles.extend(parsed)
+            del parsed[:]
+            if len(articles) >= max_results:
+                break
+        
+        # Остаток тела только вычитываем (без разбора), чтобы соединение
+        # вернулось в пул keep-alive
+        for _ in chunks:
+            pass
+        return articles[:max_results]
     
     def get_name(self) -> str:
         """Возвращает имя провайдера."""
@@ -203,6 +404,18 @@ class NewsIntegration:
     Легко переключаемся между провайдерами.
     """
     
+    # Время жизни кэша зависит от того, насколько «живая» лента тикера
+    FRESH_NEWS_TTL_HOURS = 1     # есть новости за последние сутки
+    STALE_NEWS_TTL_HOURS = 12    # новости есть, но старые
+    EMPTY_NEWS_TTL_HOURS = 72    # новостей нет (например, РФ тикер в Finnhub)
+    # Случайный разброс срока жизни (доля TTL, не больше 30 минут), чтобы
+    # тикеры, закэшированные одним запуском, не истекали одновременно
+    TTL_JITTER = 0.1
+    MAX_TTL_JITTER_SECONDS = 1800
+    # Сколько после истечения TTL отдаём старые новости, обновляя их в фоне
+    STALE_WHILE_REVALIDATE_HOURS = 24
+    REFRESH_WORKERS = 4
+    
     def __init__(self, provider: Optional[NewsProvider] = None):
         """
         Args:
@@ -211,41 +424,308 @@ class NewsIntegration:
         self.provider = provider or MockNewsProvider()
         logger.info(f"📰 NewsIntegration инициализирована с провайдером: {self.provider.get_name()}")
         
-        self.cache_file = Path("stock_news_cache.json")
-        self.cache = self._load_cache()
+        # Кэш хранится в SQLite (строка на тикер); self.cache — фронт в памяти,
+        # записи подгружаются из базы по мере обращения к тикерам
+        self.cache_file = Path("stock_news_cache.db")
+        self.cache = {}
         self.cache_hours = 24
+        
+        # Фоновое обновление устаревших записей (stale-while-revalidate);
+        # пул и база создаются при первой необходимости
+        self._lock = threading.RLock()
+        self._inflight = set()
+        self._refresh_pool = None
+        self._db = None
+        self._db_opened = False
+        self._closed = False
+        # Тикеры, изменённые в памяти, но ещё не записанные на диск
+        self._dirty = set()
+        # Тикеры, которые уже искали в базе (чтобы не повторять SELECT)
+        self._looked_up = set()
+        _open_integrations.add(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """
+        Сохраняет кэш и освобождает ресурсы.
+        
+        Дожидается фоновых обновлений, записывает изменённые тикеры
+        и закрывает базу. Повторный вызов ничего не делает.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            # Новые фоновые обновления больше не ставятся
+            self._closed = True
+            pool, self._refresh_pool = self._refresh_pool, None
+        
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self._save_cache()
+        
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+            self._db = None
+            self._db_opened = True
+        _open_integrations.discard(self)
+    
+    def _connection(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        """
+        Возвращает соединение с базой кэша, открывая его при первом обращении.
+        
+        Args:
+            create: Создать файл базы, если его ещё нет (нужно только для записи)
+            
+        Returns:
+            Соединение или None (база закрыта, её нет или она не открылась)
+        """
+        with self._lock:
+            if self._db_opened:
+                return self._db
+            if not create and not self.cache_file.exists():
+                return None
+            self._db_opened = True
+            self._db = self._open_cache()
+            return self._db
     
-    def _load_cache(self) -> Dict:
-        """Загружает кэш новостей с диска."""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.debug(f"Ошибка загрузки кэша: {e}")
-                return {}
-        return {}
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Открывает (и при необходимости создаёт) базу кэша новостей."""
+        try:
+            db = sqlite3.connect(str(self.cache_file), isolation_level=None,
+                                 check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS news_cache ("
+                "ticker TEXT PRIMARY KEY, cached_at TEXT, expires_at TEXT, news TEXT)"
+            )
+            return db
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка открытия кэша новостей: {e}")
+            return None
+    
+    def _load_cache(self, ticker: str) -> Optional[Dict]:
+        """
+        Возвращает запись кэша тикера, подгружая её с диска при первом обращении.
+        
+        Args:
+            ticker: Тикер акции
+            
+        Returns:
+            Запись {'news', 'cached_at', 'expires_at'} или None
+        """
+        entry = self.cache.get(ticker)
+        if entry is not None or ticker in self._looked_up:
+            return entry
+        
+        db = self._connection()
+        if db is None:
+            return None
+        
+        try:
+            with self._lock:
+                self._looked_up.add(ticker)
+                row = db.execute(
+                    "SELECT cached_at, expires_at, news FROM news_cache WHERE ticker = ?",
+                    (ticker,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Ошибка загрузки кэша {ticker}: {e}")
+            return None
+        
+        if row is None:
+            return None
+        
+        cached_at, expires_at, news = row
+        
+        # Запись, которую нельзя отдать даже как устаревшую, не разбираем
+        if expires_at:
+            stale_until = (datetime.fromisoformat(expires_at)
+                           + timedelta(hours=self.STALE_WHILE_REVALIDATE_HOURS))
+            if datetime.now() >= stale_until:
+                return None
+        
+        news = _load_news(news)
+        entry = {'news': news, 'cached_at': cached_at}
+        if expires_at:
+            entry['expires_at'] = expires_at
+        with self._lock:
+            return self.cache.setdefault(ticker, entry)
     
     def _save_cache(self):
-        """Сохраняет кэш новостей на диск."""
+        """
+        Сохраняет изменённые записи кэша на диск.
+        
+        Перезаписываются только строки изменившихся тикеров, одной
+        транзакцией; если изменений нет, база не трогается.
+        """
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                if not self._dirty:
+                    return
+                db = self._connection(create=True)
+                if db is None:
+                    return
+                rows = [
+                    (ticker, entry['cached_at'], entry.get('expires_at'),
+                     _dump_news(entry['news']))
+                    for ticker, entry in ((t, self.cache.get(t)) for t in self._dirty)
+                    if entry is not None
+                ]
+                db.execute("BEGIN")
+                try:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO news_cache VALUES (?, ?, ?, ?)", rows
+                    )
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                self._dirty.clear()
         except Exception as e:
             logger.error(f"Ошибка сохранения кэша: {e}")
     
+    def _ttl_for(self, ticker: str, news: List[Dict]) -> float:
+        """
+        Выбирает время жизни кэша по свежести новостей тикера.
+        
+        Вызывается только для успешного ответа провайдера (ошибки
+        не кэшируются), поэтому пустой список - действительно «новостей нет».
+        
+        Args:
+            ticker: Тикер акции
+            news: Закэшированные новости
+            
+        Returns:
+            TTL в часах
+        """
+        dates = [item.get('date', '') for item in news]
+        dates = [d for d in dates if d and d != 'Unknown']
+        
+        if not news:
+            # Негативный кэш: провайдер не знает тикер — не спрашиваем часто
+            ttl = self.EMPTY_NEWS_TTL_HOURS
+        elif not dates:
+            ttl = self.cache_hours
+        elif max(dates) >= (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'):
+            ttl = self.FRESH_NEWS_TTL_HOURS
+        else:
+            ttl = self.STALE_NEWS_TTL_HOURS
+        
+        logger.debug(f"📰 TTL кэша новостей {ticker}: {ttl} ч")
+        return ttl
+    
+    def _expires_at(self, ticker: str, entry: Dict) -> datetime:
+        """Возвращает момент истечения записи кэша."""
+        if 'expires_at' in entry:
+            return datetime.fromisoformat(entry['expires_at'])
+        
+        # Записи старого формата: срок считаем от cached_at. Тогда ошибки
+        # провайдера тоже кэшировались пустым списком, поэтому негативный
+        # TTL к ним не применяем
+        cached_time = datetime.fromisoformat(entry['cached_at'])
+        if not entry['news']:
+            return cached_time + timedelta(hours=self.cache_hours)
+        return cached_time + timedelta(hours=self._ttl_for(ticker, entry['news']))
+    
     def _is_cache_fresh(self, ticker: str) -> bool:
         """Проверяет, свежий ли кэш для тикера."""
-        if ticker not in self.cache:
+        entry = self._load_cache(ticker)
+        if entry is None:
             return False
         
         try:
-            cached_time = datetime.fromisoformat(self.cache[ticker]['cached_at'])
-            age_hours = (datetime.now() - cached_time).total_seconds() / 3600
-            return age_hours < self.cache_hours
+            return datetime.now() < self._expires_at(ticker, entry)
         except Exception:
             return False
     
+    def _is_cache_servable(self, ticker: str) -> bool:
+        """Проверяет, можно ли отдать устаревший кэш, пока он обновляется в фоне."""
+        entry = self._load_cache(ticker)
+        if entry is None:
+            return False
+        
+        try:
+            stale_until = (self._expires_at(ticker, entry)
+                           + timedelta(hours=self.STALE_WHILE_REVALIDATE_HOURS))
+            return datetime.now() < stale_until
+        except Exception:
+            return False
+    
+    def _get_cached(self, ticker: str, max_results: int) -> Optional[List[Dict]]:
+        """
+        Возвращает новости из кэша, если их можно отдать без ожидания провайдера.
+        
+        Устаревшая (но не слишком) запись отдаётся как есть, а её обновление
+        ставится в фоновый пул.
+        
+        Args:
+            ticker: Тикер акции
+            max_results: Максимум результатов для фонового обновления
+            
+        Returns:
+            Список новостей или None, если нужно идти к провайдеру
+        """
+        if self._is_cache_fresh(ticker):
+            logger.debug(f"📰 Новости {ticker} загружены из кэша")
+            return self.cache[ticker]['news']
+        
+        if self._is_cache_servable(ticker):
+            logger.debug(f"📰 Новости {ticker} из устаревшего кэша, обновляем в фоне")
+            self._schedule_refresh(ticker, max_results)
+            return self.cache[ticker]['news']
+        
+        return None
+    
+    def _schedule_refresh(self, ticker: str, max_results: int):
+        """Ставит фоновое обновление тикера, если оно ещё не запущено."""
+        with self._lock:
+            if ticker in self._inflight or self._closed:
+                return
+            self._inflight.add(ticker)
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(max_workers=self.REFRESH_WORKERS,
+                                                        thread_name_prefix="news-refresh")
+            self._refresh_pool.submit(self._refresh, ticker, max_results)
+    
+    def _refresh(self, ticker: str, max_results: int):
+        """Обновляет запись кэша тикера (выполняется в фоновом потоке)."""
+        try:
+            news_list = self.provider.search_news(ticker, max_results)
+            if news_list is None:
+                # Провайдер недоступен: устаревшая запись лучше пустой
+                logger.warning(f"⚠️ Не удалось обновить новости {ticker}, остаётся старый кэш")
+                return
+            with self._lock:
+                self._cache_news(ticker, news_list)
+                self._save_cache()
+        except Exception as e:
+            logger.error(f"❌ Ошибка фонового обновления новостей {ticker}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(ticker)
+    
+    def _cache_news(self, ticker: str, news_list: List[Dict]):
+        """Кладёт новости тикера в кэш в памяти и помечает его для записи на диск."""
+        now = datetime.now()
+        ttl_seconds = self._ttl_for(ticker, news_list) * 3600
+        jitter = min(ttl_seconds * self.TTL_JITTER, self.MAX_TTL_JITTER_SECONDS)
+        expires_at = now + timedelta(seconds=ttl_seconds + random.uniform(-jitter, jitter))
+        
+        with self._lock:
+            self.cache[ticker] = {
+                'news': news_list,
+                'cached_at': now.isoformat(),
+                'expires_at': expires_at.isoformat()
+            }
+            self._dirty.add(ticker)
+    
     def search_news(self, ticker: str, max_results: int = 5) -> List[Dict]:
         """
         Ищет новости по тикеру через активный провайдер.
@@ -258,36 +738,57 @@ class NewsIntegration:
             Список новостей
         """
         # Проверяем кэш
-        if self._is_cache_fresh(ticker):
-            logger.debug(f"📰 Новости {ticker} загружены из кэша")
-            return self.cache[ticker]['news']
+        cached = self._get_cached(ticker, max_results)
+        if cached is not None:
+            return cached
         
         # Получаем из провайдера
         news_list = self.provider.search_news(ticker, max_results)
+        if news_list is None:
+            # Ошибку не кэшируем: при следующем запросе спросим провайдера снова
+            return []
         
-        # Кэшируем результат
-        self.cache[ticker] = {
-            'news': news_list,
-            'cached_at': datetime.now().isoformat()
-        }
-        self._save_cache()
+        # Кэшируем результат (на диск — в get_news_for_analysis или при выходе)
+        self._cache_news(ticker, news_list)
         
         return news_list
     
-    def get_news_for_analysis(self, tickers: List[str]) -> Dict[str, List[Dict]]:
+    def get_news_for_analysis(self, tickers: List[str], max_results: int = 5) -> Dict[str, List[Dict]]:
         """
         Получает новости для всех тикеров.
         
+        Тикеры со свежим (или допустимо устаревшим) кэшем отдаются сразу,
+        остальные запрашиваются одним вызовом provider.search_news_batch.
+        Кэш сохраняется на диск один раз после всех запросов.
+        
         Args:
             tickers: Список тикеров
+            max_results: Максимум новостей на тикер
             
         Returns:
             Словарь {ticker: [news]}
         """
-        news_by_ticker = {}
+        tickers = list(dict.fromkeys(tickers))
+        results = {}
+        stale = []
+        
+        for ticker in tickers:
+            cached = self._get_cached(ticker, max_results)
+            if cached is not None:
+                results[ticker] = cached
+            else:
+                stale.append(ticker)
+        
+        if stale:
+            for ticker, news_list in self.provider.search_news_batch(stale, max_results).items():
+                self._cache_news(ticker, news_list)
+                results[ticker] = news_list
         
+        self._save_cache()
+        
+        news_by_ticker = {}
         for ticker in tickers:
-            news = self.search_news(ticker)
+            news = results.get(ticker)
             if news:
                 news_by_ticker[ticker] = news
                 logger.info(f"✅ Найдено {len(news)} новостей по {ticker}")
@@ -310,7 +811,7 @@ class NewsIntegration:
         if not news:
             return f"*Нет актуальных новостей по {ticker}*"
         
-        formatted = f"### 📰 Новости {ticker}\n\n"
+        parts = [f"### 📰 Новости {ticker}\n\n"]
         
         for i, item in enumerate(news[:3], 1):
             title = item.get('title', 'Без названия')
@@ -324,9 +825,9 @@ class NewsIntegration:
                 'NEUTRAL': '⚪'
             }.get(sentiment, '⚪')
             
-            formatted += f"{i}. {emoji} **{title}** ({date}) - [{source}]\n"
+            parts.append(f"{i}. {emoji} **{title}** ({date}) - [{source}]\n")
         
-        return formatted
+        return "".join(parts)
     
     def analyze_sentiment(self, news_list: List[Dict]) -> str:
         """
@@ -341,8 +842,9 @@ class NewsIntegration:
         if not news_list:
             return 'NEUTRAL'
         
-        positive_count = sum(1 for n in news_list if n.get('sentiment') == 'POSITIVE')
-        negative_count = sum(1 for n in news_list if n.get('sentiment') == 'NEGATIVE')
+        counts = Counter(n.get('sentiment', 'NEUTRAL') for n in news_list)
+        positive_count = counts['POSITIVE']
+        negative_count = counts['NEGATIVE']
         
         if positive_count > negative_count:
             return 'POSITIVE'
@@ -368,11 +870,9 @@ def get_news_context_for_buy_signals(buy_signals: List[Dict]) -> Dict[str, str]:
     Returns:
         Словарь {ticker: news_context}
     """
-    # Используем Mock провайдер (новостей нет)
-    news_integration = NewsIntegration()
+    # Mock провайдер всё равно вернёт пусто - NewsIntegration не создаём
     news_context = {}
     
-    # Ничего не добавляем, так как провайдер вернёт пусто
     logger.debug("⚠️ get_news_context_for_buy_signals: новости отключены (используется Mock провайдер)")
     
     return news_context
@@ -0,0 +1,156 @@
+"""
+Parquet-копии CSV котировок ({ticker}_full.parquet рядом с {ticker}_full.csv).
+
+CSV остаётся основным форматом (его пишет StockDataManager), копия нужна
+только для быстрого чтения. Все модули читают и пишут копию через этот
+модуль, поэтому у неё одна схема: колонки PRICE_COLUMNS с типами PRICE_DTYPES.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+# pyarrow (опционально) - без него копии не создаются, читается CSV
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Колонки котировок (схема Parquet-копии)
+PRICE_COLUMNS = ['DATE', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
+
+# Типы колонок копии не зависят от содержимого CSV: цены float64, даже если
+# записаны целыми, VOLUME тоже float64 (в CSV бывают пропуски объема)
+PRICE_DTYPES = {'OPEN': 'float64', 'HIGH': 'float64', 'LOW': 'float64', 'CLOSE': 'float64',
+                'VOLUME': 'float64'}
+
+
+def sidecar_path(csv_path: Path) -> Path:
+    """Возвращает путь к Parquet-копии CSV."""
+    return Path(csv_path).with_suffix('.parquet')
+
+
+def write_parquet(df: pd.DataFrame, path: Path):
+    """
+    Сохраняет DataFrame в Parquet атомарно.
+    
+    Пишем во временный файл и подменяем целевой: прерванная запись
+    не оставит обрезанную копию, которая новее CSV. Имя временного файла
+    своё у каждого потока, чтобы параллельные записи не мешали друг другу.
+    
+    Args:
+        df: DataFrame для сохранения
+        path: путь к *.parquet файлу
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        df.to_parquet(tmp_path, engine='pyarrow', compression='snappy', index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def write_sidecar(csv_path: Path, df: pd.DataFrame) -> bool:
+    """
+    Пишет Parquet-копию CSV из уже загруженных котировок.
+    
+    Args:
+        csv_path: путь к CSV файлу
+        df: котировки (DATE - datetime64, остальные колонки PRICE_COLUMNS)
+    
+    Returns:
+        True, если копия записана
+    """
+    if not PYARROW_AVAILABLE:
+        return False
+    
+    path = sidecar_path(csv_path)
+    try:
+        write_parquet(df[PRICE_COLUMNS].astype(PRICE_DTYPES), path)
+        return True
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить {path}: {e}")
+        return False
+
+
+def _read_sidecar(csv_path: Path, columns: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Читает Parquet-копию, если её CSV существует, копия не старше CSV
+    и содержит все PRICE_COLUMNS.
+    
+    Копия без CSV не используется: удалённый тикер не должен анализироваться
+    по старым данным.
+    
+    Returns:
+        DataFrame с колонками columns или None (копии или CSV нет, копия
+        устарела, записана в старой схеме или не читается)
+    """
+    path = sidecar_path(csv_path)
+    try:
+        if not path.exists() or not csv_path.exists():
+            return None
+        if path.stat().st_mtime_ns < csv_path.stat().st_mtime_ns:
+            return None
+        if not set(PRICE_COLUMNS) <= set(pq.read_schema(path).names):
+            return None
+        df = pd.read_parquet(path, columns=columns)
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать {path}: {e}")
+        return None
+    
+    df['DATE'] = pd.to_datetime(df['DATE'])
+    return df
+
+
+def load_prices(csv_path: Path, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    Загружает котировки тикера, предпочитая Parquet-копию CSV.
+    
+    Если копия актуальна - читаются только нужные колонки, без разбора
+    текста. Иначе читается CSV и копия пересоздаётся для следующих запусков.
+    В CSV старого формата нет части PRICE_COLUMNS - он читается целиком,
+    как раньше, копия не создаётся, а в результате только имеющиеся колонки.
+    
+    Args:
+        csv_path: путь к CSV файлу ({ticker}_full.csv)
+        columns: нужные колонки (подмножество PRICE_COLUMNS, по умолчанию все)
+    
+    Returns:
+        DataFrame с котировками (DATE - datetime64) или None, если CSV нет
+    """
+    csv_path = Path(csv_path)
+    columns = columns or PRICE_COLUMNS
+    
+    if PYARROW_AVAILABLE:
+        df = _read_sidecar(csv_path, columns)
+        if df is not None:
+            return df
+    
+    if not csv_path.exists():
+        return None
+    
+    missing = [col for col in PRICE_COLUMNS if col not in pd.read_csv(csv_path, nrows=0).columns]
+    if missing:
+        logger.warning(f"В {csv_path} нет колонок {missing}, Parquet-копия не создаётся")
+        df = pd.read_csv(csv_path, parse_dates=['DATE'])
+        return df[[col for col in columns if col in df.columns]]
+    
+    if PYARROW_AVAILABLE:
+        # Многопоточный парсер pyarrow: даты и числа разбираются в C++
+        df = pd.read_csv(csv_path, engine='pyarrow', usecols=PRICE_COLUMNS,
+                         parse_dates=['DATE'])
+    else:
+        df = pd.read_csv(csv_path, usecols=PRICE_COLUMNS, parse_dates=['DATE'])
+    df = df.astype(PRICE_DTYPES)
+    
+    write_sidecar(csv_path, df)
+    return df[columns]
@@ -4,13 +4,15 @@
 Создаёт красивые еженедельные отчёты с рейтингом, сигналами и подробным анализом.
 """
 
-import pandas as pd
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import logging
 
+import numpy as np
+
 from technical_analysis import TechnicalAnalyzer
 from audit_manager import AuditManager
 
@@ -22,6 +24,9 @@ logger = logging.getLogger(__name__)
 class ReportGenerator:
     """Генератор отчётов для технического анализа."""
 
+    # Потоки для параллельного анализа тикеров в generate_weekly_report
+    ANALYSIS_WORKERS = 8
+
     def __init__(self, reports_dir: str = "reports"):
         """
         Инициализация генератора.
@@ -57,7 +62,7 @@ class ReportGenerator:
             return signals
 
         rsi = analysis_result['technical_indicators'].get('rsi')
-        trend = analysis_result['trend']
+        trend = analysis_result.get('trend')
         price_change = analysis_result.get('price_change_pct', 0)
 
         # Проверяем условия
@@ -96,8 +101,8 @@ class ReportGenerator:
 
         return signals
 
-    @staticmethod
-    def rank_stocks(analysis_results: List[Dict]) -> List[Dict]:
+    @classmethod
+    def rank_stocks(cls, analysis_results: List[Dict]) -> List[Dict]:
         """
         Ранжирует акции по качеству сигнала.
 
@@ -107,69 +112,63 @@ class ReportGenerator:
         Returns:
             Отсортированный список с рейтингом
         """
-        ranked = []
-
-        for result in analysis_results:
-            if not result:
-                continue
-
-            score = 0
-            factors = []
-
+        results = [result for result in analysis_results if result]
+        if not results:
+            return []
+
+        trends = [result.get('trend', {}) for result in results]
+        rsis = [result.get('technical_indicators', {}).get('rsi') for result in results]
+
+        # Признаки всех акций - массивами, скор считается векторно
+        direction = np.array([trend.get('trend') for trend in trends], dtype=object)
+        strong = np.array([trend.get('strength') == 'strong' for trend in trends], dtype=bool)
+        up = direction == 'up'
+        down = direction == 'down'
+        # Пустой RSI (None/0) не даёт баллов - как и NaN, он не проходит ни одно сравнение
+        rsi = np.array([value if value else np.nan for value in rsis], dtype=float)
+        above_ma = np.array([bool(trend.get('above_ma20') and trend.get('above_ma50'))
+                             for trend in trends], dtype=bool)
+        volume_up = np.array([result.get('volume', {}).get('volume_trend') == 'increasing'
+                              for result in results], dtype=bool)
+
+        # (условие, баллы, описание) в порядке вывода факторов
+        terms = [
             # Тренд (макс 40 баллов)
-            trend = result.get('trend', {})
-            if trend.get('trend') == 'up':
-                if trend.get('strength') == 'strong':
-                    score += 40
-                    factors.append('Сильный восход. тренд (+40)')
-                else:
-                    score += 25
-                    factors.append('Умеренный восход. тренд (+25)')
-            elif trend.get('trend') == 'down':
-                if trend.get('strength') == 'strong':
-                    score -= 20
-                    factors.append('Сильный нисход. тренд (-20)')
-
+            (up & strong, 40, 'Сильный восход. тренд (+40)'),
+            (up & ~strong, 25, 'Умеренный восход. тренд (+25)'),
+            (down & strong, -20, 'Сильный нисход. тренд (-20)'),
             # RSI (макс 30 баллов)
-            rsi = result.get('technical_indicators', {}).get('rsi')
-            if rsi:
-                if 30 < rsi < 70:
-                    score += 20
-                    factors.append('RSI нейтральный (+20)')
-                elif rsi < 30:
-                    score += 30
-                    factors.append('RSI низкий - сигнал покупки (+30)')
-                elif rsi > 70:
-                    score -= 15
-                    factors.append('RSI высокий - риск (+15)')
-
+            ((rsi > 30) & (rsi < 70), 20, 'RSI нейтральный (+20)'),
+            (rsi < 30, 30, 'RSI низкий - сигнал покупки (+30)'),
+            (rsi > 70, -15, 'RSI высокий - риск (+15)'),
             # Цена выше МА (макс 20 баллов)
-            if trend.get('above_ma20') and trend.get('above_ma50'):
-                score += 20
-                factors.append('Цена выше MA20 и MA50 (+20)')
-
+            (above_ma, 20, 'Цена выше MA20 и MA50 (+20)'),
             # Объёмы (макс 10 баллов)
-            volume = result.get('volume', {})
-            if volume.get('volume_trend') == 'increasing':
-                score += 10
-                factors.append('Растущие объёмы (+10)')
+            (volume_up, 10, 'Растущие объёмы (+10)'),
+        ]
+
+        scores = np.zeros(len(results), dtype=np.int64)
+        for mask, points, _ in terms:
+            scores += np.where(mask, points, 0)
 
+        # Сортируем по скору (по убыванию); stable - равные скоры в исходном порядке
+        ranked = []
+        for idx in np.argsort(-scores, kind='stable'):
+            result = results[idx]
             ranked.append({
                 'ticker': result.get('ticker'),
-                'score': score,
+                'score': int(scores[idx]),
                 'price': result.get('current_price'),
                 'price_change': result.get('price_change_pct'),
-                'rsi': rsi,
-                'trend': trend.get('trend'),
-                'factors': factors,
+                'rsi': rsis[idx],
+                'trend': trends[idx].get('trend'),
+                'factors': [label for mask, _, label in terms if mask[idx]],
                 'full_result': result,
+                'signals': cls.find_signals(result),
                 'is_excluded': result.get('is_excluded', False),  # ← ДОБАВЛЯЕМ!
                 'excluded_reason': result.get('excluded_reason', None)  # ← ДОБАВЛЯЕМ!
             })
 
-        # Сортируем по скору (по убыванию)
-        ranked.sort(key=lambda x: x['score'], reverse=True)
-
         # Присваиваем рейтинг
         for idx, item in enumerate(ranked, 1):
             item['rank'] = idx
@@ -234,96 +233,147 @@ class ReportGenerator:
 
         return text
 
-    def generate_detailed_analysis(self, analysis_result: Dict) -> str:
+    def generate_detailed_analysis(self, analysis_result: Dict,
+                                   signals: Optional[Dict[str, str]] = None) -> str:
         """
         Генерирует детальный анализ для одной акции.
 
         Args:
             analysis_result: Результат анализа
+            signals: Уже найденные сигналы (из rank_stocks); если None - ищутся заново
 
         Returns:
             Markdown текст анализа
         """
         ticker = analysis_result.get('ticker', 'N/A')
-        text = f"## {ticker} - Детальный анализ\n\n"
+        parts = [f"## {ticker} - Детальный анализ\n\n"]
 
         # Базовая информация
-        text += "### Базовая информация\n\n"
-        text += f"- **Текущая цена:** {analysis_result.get('current_price', 0):.2f} ₽\n"
-        text += f"- **Изменение:** {analysis_result.get('price_change', 0):+.2f} ({analysis_result.get('price_change_pct', 0):+.2f}%)\n"
-        text += f"- **Период:** {analysis_result.get('date_from')} - {analysis_result.get('date_to')}\n"
-        text += f"- **Данных:** {analysis_result.get('data_points')} дней\n\n"
+        parts.append("### Базовая информация\n\n")
+        parts.append(f"- **Текущая цена:** {analysis_result.get('current_price', 0):.2f} ₽\n")
+        parts.append(f"- **Изменение:** {analysis_result.get('price_change', 0):+.2f} ({analysis_result.get('price_change_pct', 0):+.2f}%)\n")
+        parts.append(f"- **Период:** {analysis_result.get('date_from')} - {analysis_result.get('date_to')}\n")
+        parts.append(f"- **Данных:** {analysis_result.get('data_points')} дней\n\n")
 
         # Сигнал
-        signals = self.find_signals(analysis_result)
-        text += f"### Сигнал\n\n"
-        text += f"**{signals['primary']}** ({signals['strength']})\n\n"
+        if signals is None:
+            signals = self.find_signals(analysis_result)
+        parts.append(f"### Сигнал\n\n")
+        parts.append(f"**{signals['primary']}** ({signals['strength']})\n\n")
         if signals['indicators']:
             for indicator in signals['indicators']:
-                text += f"- {indicator}\n"
-        text += "\n"
+                parts.append(f"- {indicator}\n")
+        parts.append("\n")
 
         # Технические индикаторы
-        text += "### Технические индикаторы\n\n"
+        parts.append("### Технические индикаторы\n\n")
         ind = analysis_result.get('technical_indicators', {})
-        text += f"- **EMA 20:** {ind.get('ema_20', 'N/A'):.2f}\n" if ind.get('ema_20') else ""
-        text += f"- **EMA 50:** {ind.get('ema_50', 'N/A'):.2f}\n" if ind.get('ema_50') else ""
-        text += f"- **EMA 200:** {ind.get('ema_200', 'N/A'):.2f}\n" if ind.get('ema_200') else ""
-        text += f"- **RSI (14):** {ind.get('rsi', 'N/A'):.2f} ({ind.get('rsi_signal', 'N/A')})\n" if ind.get('rsi') else ""
-        text += "\n"
+        if ind.get('ema_20'):
+            parts.append(f"- **EMA 20:** {ind.get('ema_20', 'N/A'):.2f}\n")
+        if ind.get('ema_50'):
+            parts.append(f"- **EMA 50:** {ind.get('ema_50', 'N/A'):.2f}\n")
+        if ind.get('ema_200'):
+            parts.append(f"- **EMA 200:** {ind.get('ema_200', 'N/A'):.2f}\n")
+        if ind.get('rsi'):
+            parts.append(f"- **RSI (14):** {ind.get('rsi', 'N/A'):.2f} ({ind.get('rsi_signal', 'N/A')})\n")
+        parts.append("\n")
 
         # Тренд анализ
-        text += "### Анализ тренда\n\n"
+        parts.append("### Анализ тренда\n\n")
         trend = analysis_result.get('trend', {})
         if trend:
             symbol = "📈" if trend.get('trend') == 'up' else "📉" if trend.get('trend') == 'down' else "➡️"
-            text += f"- **Тренд:** {symbol} {trend.get('trend', 'N/A').upper()}\n"
-            text += f"- **Сила:** {trend.get('strength', 'N/A').upper()}\n"
-            text += f"- **Выше MA20:** {'✅ Да' if trend.get('above_ma20') else '❌ Нет'}\n"
-            text += f"- **Выше MA50:** {'✅ Да' if trend.get('above_ma50') else '❌ Нет'}\n"
-            text += f"- **MA20:** {trend.get('ma_20', 'N/A'):.2f}\n"
-            text += f"- **MA50:** {trend.get('ma_50', 'N/A'):.2f}\n"
-            text += "\n"
+            parts.append(f"- **Тренд:** {symbol} {trend.get('trend', 'N/A').upper()}\n")
+            parts.append(f"- **Сила:** {trend.get('strength', 'N/A').upper()}\n")
+            parts.append(f"- **Выше MA20:** {'✅ Да' if trend.get('above_ma20') else '❌ Нет'}\n")
+            parts.append(f"- **Выше MA50:** {'✅ Да' if trend.get('above_ma50') else '❌ Нет'}\n")
+            parts.append(f"- **MA20:** {trend.get('ma_20', 'N/A'):.2f}\n")
+            parts.append(f"- **MA50:** {trend.get('ma_50', 'N/A'):.2f}\n")
+            parts.append("\n")
 
         # Поддержка/сопротивление
-        text += "### Уровни поддержки и сопротивления\n\n"
+        parts.append("### Уровни поддержки и сопротивления\n\n")
         sr = analysis_result.get('support_resistance', {})
         if sr:
-            text += f"- **Поддержка:** {sr.get('support', 'N/A'):.2f}\n"
-            text += f"- **Сопротивление:** {sr.get('resistance', 'N/A'):.2f}\n"
-            text += f"- **Расстояние:** {sr.get('resistance', 0) - sr.get('support', 0):.2f}\n"
-            text += "\n"
+            parts.append(f"- **Поддержка:** {sr.get('support', 'N/A'):.2f}\n")
+            parts.append(f"- **Сопротивление:** {sr.get('resistance', 'N/A'):.2f}\n")
+            parts.append(f"- **Расстояние:** {sr.get('resistance', 0) - sr.get('support', 0):.2f}\n")
+            parts.append("\n")
 
         # Анализ объёмов
-        text += "### Анализ объёмов\n\n"
+        parts.append("### Анализ объёмов\n\n")
         vol = analysis_result.get('volume', {})
         if vol:
-            text += f"- **Средний объём:** {vol.get('avg_volume', 0):,.0f}\n"
-            text += f"- **Point of Control:** {vol.get('point_of_control', 'N/A'):.2f}\n"
-            text += f"- **Тренд объёма:** {vol.get('volume_trend', 'N/A')}\n"
-            text += "\n"
+            parts.append(f"- **Средний объём:** {vol.get('avg_volume', 0):,.0f}\n")
+            parts.append(f"- **Point of Control:** {vol.get('point_of_control', 'N/A'):.2f}\n")
+            parts.append(f"- **Тренд объёма:** {vol.get('volume_trend', 'N/A')}\n")
+            parts.append("\n")
 
         # Точки входа
-        text += self._format_entry_points(analysis_result)
+        parts.append(self._format_entry_points(analysis_result))
 
         # Цели прибыли
-        text += self._format_take_profit(analysis_result)
+        parts.append(self._format_take_profit(analysis_result))
 
         # Стоп-лосс
-        text += self._format_stop_loss(analysis_result)
+        parts.append(self._format_stop_loss(analysis_result))
 
         # Выводы
-        text += "### Вывод\n\n"
+        parts.append("### Вывод\n\n")
         if signals['primary'] == '🟢 ПОКУПКА':
-            text += "✅ **Рекомендация:** Подходит для долгосрочного входа.\n"
+            parts.append("✅ **Рекомендация:** Подходит для долгосрочного входа.\n")
         elif signals['primary'] == '🔴 ПРОДАЖА':
-            text += "⛔ **Рекомендация:** Высокий риск. Избегать покупки.\n"
+            parts.append("⛔ **Рекомендация:** Высокий риск. Избегать покупки.\n")
         else:
-            text += "⚠️ **Рекомендация:** Ожидать более четких сигналов.\n"
+            parts.append("⚠️ **Рекомендация:** Ожидать более четких сигналов.\n")
 
-        text += "\n---\n\n"
+        parts.append("\n---\n\n")
 
-        return text
+        return "".join(parts)
+
+    def _analyze_one(self, ticker: str) -> Optional[Dict]:
+        """
+        Анализирует одну акцию и проверяет её на ложный отскок.
+
+        Выполняется в пуле потоков generate_weekly_report.
+
+        Args:
+            ticker: Тикер акции
+
+        Returns:
+            Результат анализа с полями is_excluded/excluded_reason
+            или None, если анализ не удался
+        """
+        try:
+            item = self.analyzer.analyze_stock(ticker, return_df=True)
+        except Exception as e:
+            logger.error(f"Ошибка при анализе {ticker}: {e}")
+            return None
+
+        if not item:
+            return None
+
+        # 🚨 ФИЛЬТРУЕМ ложные восстановления (отскоки от дна)
+        # Используем профессиональный анализ с ta-library (ADX, MACD, OBV, RSI, BBANDS)
+        item['is_excluded'] = False
+        item['excluded_reason'] = None
+
+        # Проверяем на ложный отскок по уже загруженным в analyze_stock данным
+        df = item.pop('_df', None)
+        try:
+            if df is not None and len(df) > 0:
+                is_false, reasons = self.analyzer.is_false_recovery(df)
+
+                if is_false:
+                    logger.warning(f"⚠️  {ticker}: исключена из BUY - ложный отскок")
+                    item['is_excluded'] = True
+                    item['excluded_reason'] = "; ".join(reasons)
+                    logger.info(f"    Причины: {item['excluded_reason']}")
+
+        except Exception as e:
+            logger.debug(f"Не удалось проверить {ticker} на ложный отскок: {e}")
+
+        return item
 
     def generate_weekly_report(self, tickers: List[str]) -> str:
         """
@@ -337,54 +387,18 @@ class ReportGenerator:
         """
         logger.info(f"Генерируем отчёт для {len(tickers)} акций")
 
-        # Анализируем все акции
-        analysis_results = []
-        for ticker in tickers:
-            try:
-                result = self.analyzer.analyze_stock(ticker)
-                if result:
-                    analysis_results.append(result)
-            except Exception as e:
-                logger.error(f"Ошибка при анализе {ticker}: {e}")
+        # Анализируем все акции параллельно (тикеры независимы);
+        # проверка на ложный отскок выполняется там же, в _analyze_one
+        workers = max(1, min(self.ANALYSIS_WORKERS, len(tickers)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            analysis_results = [result for result in executor.map(self._analyze_one, tickers) if result]
 
         if not analysis_results:
             logger.error("Не удалось проанализировать акции")
             return ""
 
-        # 🚨 ФИЛЬТРУЕМ ложные восстановления (отскоки от дна)
-        # Используем профессиональный анализ с ta-library (ADX, MACD, OBV, RSI, BBANDS)
-        filtered_results = []
-        for item in analysis_results:
-            ticker = item.get('ticker', 'N/A')
-            item['is_excluded'] = False
-            item['excluded_reason'] = None
-            
-            # Загружаем данные для проверки на ложный отскок
-            try:
-                from pathlib import Path
-                data_file = Path("stock_data") / f"{ticker}_full.csv"
-                
-                if data_file.exists():
-                    df = pd.read_csv(data_file)
-                    df['DATE'] = pd.to_datetime(df['DATE'])
-                    
-                    if df is not None and len(df) > 0:
-                        # Проверяем на ложный отскок
-                        is_false, reasons = self.analyzer.is_false_recovery(df)
-                        
-                        if is_false:
-                            logger.warning(f"⚠️  {ticker}: исключена из BUY - ложный отскок")
-                            item['is_excluded'] = True
-                            item['excluded_reason'] = "; ".join(reasons)
-                            logger.info(f"    Причины: {item['excluded_reason']}")
-                    
-            except Exception as e:
-                logger.debug(f"Не удалось проверить {ticker} на ложный отскок: {e}")
-            
-            filtered_results.append(item)
-
         # Ранжируем акции
-        ranked = self.rank_stocks(filtered_results)
+        ranked = self.rank_stocks(analysis_results)
 
         # Начинаем отчёт
         now = datetime.now()
@@ -392,15 +406,15 @@ class ReportGenerator:
         week_start = (now - timedelta(days=now.weekday())).strftime('%d.%m.%Y')
         week_end = now.strftime('%d.%m.%Y')
 
-        report = f"# Еженедельный анализ акций\n\n"
-        report += f"**Дата:** {date_str}  \n"
-        report += f"**Неделя:** {week_start} - {week_end}  \n"
-        report += f"**Проанализировано акций:** {len(analysis_results)}\n\n"
+        parts = [f"# Еженедельный анализ акций\n\n"]
+        parts.append(f"**Дата:** {date_str}  \n")
+        parts.append(f"**Неделя:** {week_start} - {week_end}  \n")
+        parts.append(f"**Проанализировано акций:** {len(analysis_results)}\n\n")
 
         # Таблица рейтинга
-        report += "## 🏆 Рейтинг акций\n\n"
-        report += "| # | Тикер | Цена | Изм% | RSI | Тренд | Сигнал | Скор | Комментарий |\n"
-        report += "|---|-------|------|------|-----|-------|--------|------|-------------|\n"
+        parts.append("## 🏆 Рейтинг акций\n\n")
+        parts.append("| # | Тикер | Цена | Изм% | RSI | Тренд | Сигнал | Скор | Комментарий |\n")
+        parts.append("|---|-------|------|------|-----|-------|--------|------|-------------|\n")
 
         for item in ranked:
             # 🚨 ПРОПУСКАЕМ исключённые акции
@@ -426,27 +440,27 @@ class ReportGenerator:
             # Главный фактор
             main_factor = item['factors'][0] if item['factors'] else "Нейтрально"
 
-            report += f"| {rank} | **{ticker}** | {price} | {change} | {rsi} | {trend} | {signal} | {score} | {main_factor} |\n"
+            parts.append(f"| {rank} | **{ticker}** | {price} | {change} | {rsi} | {trend} | {signal} | {score} | {main_factor} |\n")
 
-        report += "\n"
+        parts.append("\n")
 
         # Топ сигналы
-        report += "## 📊 Главные сигналы\n\n"
+        parts.append("## 📊 Главные сигналы\n\n")
 
         buy_signals = [item for item in ranked if item['score'] >= 60]
         sell_signals = [item for item in ranked if item['score'] <= -10]
         hold_signals = [item for item in ranked if -10 < item['score'] < 60]
 
         if buy_signals:
-            report += "### 🟢 Сигналы на ПОКУПКУ\n"
+            parts.append("### 🟢 Сигналы на ПОКУПКУ\n")
             for item in buy_signals:  # ← ВСЕ BUY сигналы, не только топ-3!
                 # 🚨 Проверяем не исключена ли акция
                 if item.get('is_excluded', False):
                     reason = item.get('excluded_reason', 'неизвестно')
-                    report += f"- **{item['ticker']}** (⚠️ исключена: {reason})\n"
+                    parts.append(f"- **{item['ticker']}** (⚠️ исключена: {reason})\n")
                     continue
                 
-                report += f"- **{item['ticker']}** (скор: {item['score']}) - {item['factors'][0]}\n"
+                parts.append(f"- **{item['ticker']}** (скор: {item['score']}) - {item['factors'][0]}\n")
                 
                 # 🔥 ДОБАВЛЯЕМ В АРХИВ РЕКОМЕНДАЦИЙ
                 try:
@@ -482,26 +496,26 @@ class ReportGenerator:
                 except Exception as e:
                     logger.error(f"❌ Ошибка при добавлении рекомендации {item['ticker']}: {e}")
             
-            report += "\n"
+            parts.append("\n")
 
         if sell_signals:
-            report += "### 🔴 Сигналы на ПРОДАЖУ\n"
+            parts.append("### 🔴 Сигналы на ПРОДАЖУ\n")
             for item in sell_signals[:3]:
-                report += f"- **{item['ticker']}** (скор: {item['score']}) - {item['factors'][0]}\n"
-            report += "\n"
+                parts.append(f"- **{item['ticker']}** (скор: {item['score']}) - {item['factors'][0]}\n")
+            parts.append("\n")
 
         if hold_signals:
-            report += "### 🟡 HOLD (Ожидание)\n"
-            report += f"- Остальные {len(hold_signals)} акции\n\n"
+            parts.append("### 🟡 HOLD (Ожидание)\n")
+            parts.append(f"- Остальные {len(hold_signals)} акции\n\n")
 
         # Детальный анализ
-        report += "## 📈 Детальный анализ\n\n"
+        parts.append("## 📈 Детальный анализ\n\n")
 
         for item in ranked:
-            report += self.generate_detailed_analysis(item['full_result'])
+            parts.append(self.generate_detailed_analysis(item['full_result'], signals=item['signals']))
 
         logger.info("Отчёт сгенерирован успешно")
-        return report
+        return "".join(parts)
 
     def save_report(self, report_text: str, filename: Optional[str] = None) -> Path:
         """
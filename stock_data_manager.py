@@ -5,6 +5,8 @@
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
@@ -13,6 +15,8 @@ import pandas as pd
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+import price_store
+
 
 # Настройка логирования
 logging.basicConfig(
@@ -32,11 +36,13 @@ class StockDataManager:
     BASE_URL = "https://iss.moex.com/iss/history/engines/stock/markets/shares/securities"
     DATA_DIR = Path("stock_data")
     BATCH_SIZE = 100  # Максимум записей за запрос
+    MAX_CONCURRENT_REQUESTS = 4  # Одновременных запросов к API (вежливый лимит)
 
     def __init__(self):
         """Инициализация менеджера."""
         self._create_data_directory()
         self._setup_session()
+        self._request_limit = threading.BoundedSemaphore(self.MAX_CONCURRENT_REQUESTS)
         logger.info("StockDataManager инициализирован")
 
     def _create_data_directory(self) -> None:
@@ -111,7 +117,8 @@ class StockDataManager:
         }
         
         try:
-            response = self.session.get(url, params=params, timeout=10)
+            with self._request_limit:
+                response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -314,81 +321,106 @@ class StockDataManager:
             
             df_to_save.to_csv(csv_path, index=False)
             logger.info(f"Данные {ticker} сохранены: {csv_path}")
+            
+            # Parquet-копия: анализ и аудит читают её вместо разбора CSV
+            price_store.write_sidecar(csv_path, data)
             return True
         
         except Exception as e:
             logger.error(f"Ошибка при сохранении {ticker}: {e}")
             return False
 
-    def update_watchlist(self, tickers_list: List[str]) -> Dict[str, bool]:
+    def _update_one(self, ticker: str) -> bool:
+        """
+        Обновляет данные одной акции: докачивает новые записи и сохраняет CSV.
+        
+        Args:
+            ticker: Тикер акции
+            
+        Returns:
+            True если успешно, False в противном случае
+        """
+        try:
+            logger.info(f"\n--- Обновление {ticker} ---")
+            
+            # Получаем последнюю дату в существующем файле
+            last_date = self._get_last_date_in_file(ticker)
+            
+            # Определяем начальную дату для загрузки
+            if last_date:
+                # Начинаем со дня после последнего
+                from_date = (last_date + timedelta(days=1)).strftime('%Y-%m-%d')
+                logger.info(f"Загружаем новые данные с {from_date}")
+            else:
+                # Если нет файла, загружаем со значения по умолчанию
+                # Например, за последний год
+                one_year_ago = datetime.now() - timedelta(days=365)
+                from_date = one_year_ago.strftime('%Y-%m-%d')
+                logger.info(f"Загружаем исторические данные с {from_date}")
+            
+            # Скачиваем данные
+            new_data = self.download_stock_data(ticker, from_date=from_date)
+            
+            if new_data.empty:
+                logger.warning(f"Нет новых данных для {ticker}")
+                return False
+            
+            # Если существует файл, объединяем данные
+            if last_date is not None:
+                existing_data = pd.read_csv(
+                    self._get_csv_path(ticker),
+                    parse_dates=['DATE']
+                )
+                merged_data = self._merge_data(existing_data, new_data)
+                logger.info(f"Объединено данных для {ticker}: "
+                           f"{len(existing_data)} + {len(new_data)} = {len(merged_data)}")
+            else:
+                merged_data = new_data
+            
+            # Очищаем данные (удаляем дубли и дни без торговли)
+            logger.info(f"🔧 Очистка данных {ticker}:")
+            merged_data = self._clean_data(merged_data)
+            
+            # Сохраняем очищенные данные
+            success = self.save_to_csv(ticker, merged_data)
+            
+            if success:
+                logger.info(f"✓ {ticker} успешно обновлен ({len(merged_data)} записей)")
+            else:
+                logger.warning(f"✗ Ошибка при обновлении {ticker}")
+            return success
+        
+        except Exception as e:
+            logger.error(f"Критическая ошибка при обновлении {ticker}: {e}")
+            return False
+
+    def update_watchlist(
+        self,
+        tickers_list: List[str],
+        max_workers: int = 8
+    ) -> Dict[str, bool]:
         """
         Обновляет данные для списка акций.
         
+        Акции загружаются параллельно в потоках (запросы к API - ожидание
+        сети), одновременных запросов не больше MAX_CONCURRENT_REQUESTS.
+        
         Args:
             tickers_list: Список тикеров
+            max_workers: Количество потоков загрузки
             
         Returns:
-            Словарь с результатами обновления
+            Словарь с результатами обновления (в порядке tickers_list)
         """
-        results = {}
-        
         logger.info(f"Начинаем обновление для {len(tickers_list)} акций")
         
-        for ticker in tickers_list:
-            try:
-                logger.info(f"\n--- Обновление {ticker} ---")
-                
-                # Получаем последнюю дату в существующем файле
-                last_date = self._get_last_date_in_file(ticker)
-                
-                # Определяем начальную дату для загрузки
-                if last_date:
-                    # Начинаем со дня после последнего
-                    from_date = (last_date + timedelta(days=1)).strftime('%Y-%m-%d')
-                    logger.info(f"Загружаем новые данные с {from_date}")
-                else:
-                    # Если нет файла, загружаем со значения по умолчанию
-                    # Например, за последний год
-                    one_year_ago = datetime.now() - timedelta(days=365)
-                    from_date = one_year_ago.strftime('%Y-%m-%d')
-                    logger.info(f"Загружаем исторические данные с {from_date}")
-                
-                # Скачиваем данные
-                new_data = self.download_stock_data(ticker, from_date=from_date)
-                
-                if new_data.empty:
-                    logger.warning(f"Нет новых данных для {ticker}")
-                    results[ticker] = False
-                    continue
-                
-                # Если существует файл, объединяем данные
-                if last_date is not None:
-                    existing_data = pd.read_csv(
-                        self._get_csv_path(ticker),
-                        parse_dates=['DATE']
-                    )
-                    merged_data = self._merge_data(existing_data, new_data)
-                    logger.info(f"Объединено данных для {ticker}: "
-                               f"{len(existing_data)} + {len(new_data)} = {len(merged_data)}")
-                else:
-                    merged_data = new_data
-                
-                # Очищаем данные (удаляем дубли и дни без торговли)
-                logger.info(f"🔧 Очистка данных {ticker}:")
-                merged_data = self._clean_data(merged_data)
-                
-                # Сохраняем очищенные данные
-                success = self.save_to_csv(ticker, merged_data)
-                results[ticker] = success
-                
-                if success:
-                    logger.info(f"✓ {ticker} успешно обновлен ({len(merged_data)} записей)")
-                else:
-                    logger.warning(f"✗ Ошибка при обновлении {ticker}")
-            
-            except Exception as e:
-                logger.error(f"Критическая ошибка при обновлении {ticker}: {e}")
-                results[ticker] = False
+        done = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(self._update_one, ticker): ticker
+                       for ticker in dict.fromkeys(tickers_list)}
+            for future in as_completed(futures):
+                done[futures[future]] = future.result()
+        results = {ticker: done[ticker] for ticker in tickers_list}
         
         # Итоговый отчет
         successful = sum(1 for v in results.values() if v)
@@ -13,6 +13,8 @@ from typing import Dict, List, Tuple, Optional
 # Импортируем ta-library (обязательна!)
 import ta
 
+import price_store
+
 # Импортируем ConfigManager для получения уровней из конфига
 try:
     from config_manager import ConfigManager
@@ -25,6 +27,24 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def load_prices(csv_path: Path) -> pd.DataFrame:
+    """
+    Загружает котировки тикера, предпочитая Parquet-копию CSV.
+    
+    Копия ({ticker}_full.parquet) читается и пересоздаётся через price_store.
+    
+    Args:
+        csv_path: Путь к CSV файлу данных
+        
+    Returns:
+        DataFrame с котировками (DATE - datetime64)
+    """
+    df = price_store.load_prices(csv_path)
+    if df is None:
+        raise FileNotFoundError(csv_path)
+    return df
+
+
 class TechnicalAnalyzer:
     """Класс для технического анализа акций."""
 
@@ -433,13 +453,16 @@ class TechnicalAnalyzer:
             return {}
 
     @staticmethod
-    def analyze_stock(ticker: str, csv_path: Optional[str] = None) -> Dict[str, any]:
+    def analyze_stock(ticker: str, csv_path: Optional[str] = None,
+                      return_df: bool = False) -> Dict[str, any]:
         """
         Проводит полный технический анализ акции.
 
         Args:
             ticker: Тикер акции
             csv_path: Путь к CSV файлу данных (если None, ищет в stock_data/)
+            return_df: Положить загруженный DataFrame в результат под ключом
+                '_df' (чтобы вызывающий код не читал CSV повторно)
 
         Returns:
             Словарь с полными метриками анализа
@@ -457,7 +480,7 @@ class TechnicalAnalyzer:
                 return {}
 
             # Загружаем данные
-            df = pd.read_csv(csv_path, parse_dates=['DATE'])
+            df = load_prices(csv_path)
             logger.info(f"Загружены данные для {ticker}: {len(df)} записей")
 
             # Выполняем анализ
@@ -534,6 +557,8 @@ class TechnicalAnalyzer:
                 'trend': trend_analysis,
                 'volume': volume_profile
             }
+            if return_df:
+                result['_df'] = df
 
             logger.info(f"Полный анализ {ticker} завершен")
             return result